@@ -0,0 +1,43 @@
+"""Sprite animation driven by game time"""
+import pygame
+
+
+class Animator(object):
+    """Shows every animated sprite against one game-time clock
+
+    An animated sprite has frames (a shared tuple of surfaces),
+    frame_time (seconds per frame) and loop. add() stamps it with the
+    current time and advance() sets every sprite's image in one pass, so
+    nothing reads the wall clock. The clock only moves when the game
+    ticks, so pausing freezes every animation at once. Sprites that are
+    killed drop out on their own; ones that don't loop are killed after
+    their last frame.
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.sprites = pygame.sprite.Group()
+
+    def add(self, sprite):
+        """Start animating sprite from its first frame"""
+        sprite.anim_start = self.time
+        sprite.image = sprite.frames[0]
+        self.sprites.add(sprite)
+
+    def advance(self, dt):
+        """Move the clock on by dt seconds and update every sprite"""
+
+        self.time += dt
+        time = self.time
+        for sprite in self.sprites.sprites():
+            frames = sprite.frames
+            index = int((time - sprite.anim_start) / sprite.frame_time)
+            if index >= len(frames):
+                if not sprite.loop:
+                    sprite.kill()
+                    continue
+                index %= len(frames)
+            sprite.image = frames[index]
+
+    def __len__(self):
+        return len(self.sprites)
@@ -0,0 +1,280 @@
+"""Process-wide cache for decoded images and animation frames
+
+When assets/atlas.json exists (built with atlas.py) images are served
+as subsurfaces of the packed atlas pages. The pages are read once, by the
+first animation lookup or preload(); single images looked up before that,
+like the menu's gun, are loaded from their own files so the menu never
+waits on the pages. Images missing from the atlas are always loaded from
+their own files.
+"""
+import os
+import json
+import pygame
+import global_variables as G
+
+ATLAS_MANIFEST = "assets/atlas.json"
+
+POWER_UP_COLORS = ("Red", "Blue", "Yellow", "Green")
+
+# Images that aren't part of an animation but still go in the atlas
+ATLAS_IMAGES = (
+    "assets/projectile.png",
+    "assets/gun.png",
+    "assets/gun_icon.png",
+)
+
+# Decoded, converted surfaces keyed by file path
+_IMAGES = {}
+
+# Surfaces decoded by prefetch() and not yet converted, keyed by file path
+_DECODED = {}
+
+# Subsurfaces of the atlas pages keyed by file path, and the frame paths
+# of each animation, filled on first use
+_ATLAS = {"loaded": False, "images": {}, "sequences": {}}
+
+# Immutable frame sequences keyed by animation name
+_FRAMES = {}
+
+# Rotation tables keyed by (path, angles, smooth)
+_ROTATIONS = {}
+
+STATS = {"hits": 0, "misses": 0}
+
+
+def load_image(path):
+    """Return the converted surface for path, decoding it only once"""
+
+    image = _IMAGES.get(path)
+    if image is None:
+        STATS["misses"] += 1
+        image = _ATLAS["images"].get(path)
+        if image is None:
+            G.init_display()
+            image = _decode(path).convert_alpha()
+        _IMAGES[path] = image
+    else:
+        STATS["hits"] += 1
+    return image
+
+
+def load_frames(key, paths):
+    """Return the frame tuple stored under key, loading paths on a miss"""
+
+    frames = _FRAMES.get(key)
+    if frames is None:
+        STATS["misses"] += 1
+        frames = tuple(load_image(path) for path in paths)
+        _FRAMES[key] = frames
+    else:
+        STATS["hits"] += 1
+    return frames
+
+
+def sequences():
+    """Every animation the game plays, name -> frame paths in order"""
+
+    animations = {}
+    for missile_type in (1, 2, 3):
+        animations[f"missile-{missile_type}"] = [
+            f"assets/missiles/missile-{missile_type}_fly-{i}.png"
+            for i in range(10)
+        ]
+        animations[f"explosion-{missile_type}"] = [
+            f"assets/missiles/missile-{missile_type}_exp-{i}.png"
+            for i in range(9)
+        ]
+    for color in POWER_UP_COLORS:
+        animations[f"power_up-{color}"] = [
+            f"assets/power-ups/{color}/frame_{i}.png" for i in range(1, 7)
+        ]
+    return animations
+
+
+def load_sequence(name):
+    """Return the frames of the named animation"""
+
+    atlas_images()
+    paths = _ATLAS["sequences"].get(name)
+    if paths is None:
+        paths = sequences()[name]
+    return load_frames(name, paths)
+
+
+def missile_frames(missile_type):
+    """Flying animation of a missile"""
+    return load_sequence(f"missile-{missile_type}")
+
+
+def explosion_frames(missile_type):
+    """Explosion animation of a missile"""
+    return load_sequence(f"explosion-{missile_type}")
+
+
+def power_up_frames(color):
+    """Spinning animation of a power up"""
+    return load_sequence(f"power_up-{color}")
+
+
+def projectile_image():
+    """The image every projectile shares"""
+    return load_image("assets/projectile.png")
+
+
+def _decode(path):
+    """Return the decoded image at path, using a prefetched one if any"""
+
+    image = _DECODED.pop(path, None)
+    if image is None:
+        image = pygame.image.load(path)
+    return image
+
+
+def _atlas_manifest():
+    """Return the atlas manifest, or None if there is no atlas"""
+
+    if not os.path.isfile(ATLAS_MANIFEST):
+        return None
+    with open(ATLAS_MANIFEST) as manifest_file:
+        return json.load(manifest_file)
+
+
+def _page_path(page):
+    return os.path.join(os.path.dirname(ATLAS_MANIFEST), page)
+
+
+def atlas_images():
+    """Return the atlas subsurfaces by path, reading the pages once"""
+
+    if not _ATLAS["loaded"]:
+        _ATLAS["loaded"] = True
+        manifest = _atlas_manifest()
+        if manifest is not None:
+            G.init_display()
+            pages = [
+                _decode(_page_path(page)).convert_alpha()
+                for page in manifest["pages"]
+            ]
+            _ATLAS["images"] = {
+                path: pages[page].subsurface(rect)
+                for path, (page, *rect) in manifest["frames"].items()
+            }
+            _ATLAS["sequences"] = manifest["sequences"]
+    return _ATLAS["images"]
+
+
+def prefetch(executor):
+    """Decode the files preload() still needs on executor's threads
+
+    pygame can decode images on any thread, but converting them to the
+    display format belongs on the main thread, so that is left to
+    preload(), which picks up the decoded images. Returns the futures.
+    """
+
+    manifest = None if _ATLAS["loaded"] else _atlas_manifest()
+    if manifest is not None:
+        paths = [_page_path(page) for page in manifest["pages"]]
+    else:
+        paths = [path for frames in sequences().values() for path in frames]
+        paths.extend(ATLAS_IMAGES)
+        paths = [
+            path
+            for path in paths
+            if path not in _IMAGES and path not in _ATLAS["images"]
+        ]
+
+    def decode(path):
+        _DECODED[path] = pygame.image.load(path)
+
+    return [executor.submit(decode, path) for path in dict.fromkeys(paths)]
+
+
+class RotationTable(object):
+    """Rotated copies of one image, precomputed for a set of angles
+
+    Each entry holds the rotated surface and its rect centered on (0, 0),
+    so a sprite only has to move the rect onto its own center.
+    Angles outside the table are rotated on first use and kept.
+    """
+
+    def __init__(self, image, angles, smooth=False):
+        self.image = image
+        self.smooth = smooth
+        self.entries = {}
+        for angle in angles:
+            self.entries[angle] = self._rotate(angle)
+
+    def _rotate(self, angle):
+        if self.smooth:
+            rotated = pygame.transform.rotozoom(self.image, angle, 1)
+        else:
+            rotated = pygame.transform.rotate(self.image, angle)
+        return rotated, rotated.get_rect(center=(0, 0))
+
+    def get(self, angle, center):
+        """Return the surface and rect for angle, centered on center"""
+
+        entry = self.entries.get(angle)
+        if entry is None:
+            entry = self._rotate(angle)
+            self.entries[angle] = entry
+        surface, offset_rect = entry
+        return surface, offset_rect.move(center)
+
+
+def rotation_table(path, angles, smooth=False):
+    """Return the shared rotation table for the image at path"""
+
+    key = (path, tuple(angles), smooth)
+    table = _ROTATIONS.get(key)
+    if table is None:
+        STATS["misses"] += 1
+        table = RotationTable(load_image(path), key[1], smooth)
+        _ROTATIONS[key] = table
+    else:
+        STATS["hits"] += 1
+    return table
+
+
+def gun_rotations():
+    """Every angle the gun can reach"""
+    return rotation_table("assets/gun.png", range(-70, 71, 2))
+
+
+def preload():
+    """Decode every sprite animation up front so spawning costs no I/O"""
+
+    for missile_type in (1, 2, 3):
+        missile_frames(missile_type)
+        explosion_frames(missile_type)
+    for color in POWER_UP_COLORS:
+        power_up_frames(color)
+    projectile_image()
+    gun_rotations()
+
+
+def stats():
+    """Return hit/miss counts and the number of cached surfaces"""
+
+    lookups = STATS["hits"] + STATS["misses"]
+    return {
+        "hits": STATS["hits"],
+        "misses": STATS["misses"],
+        "hit_rate": STATS["hits"] / lookups if lookups else 0.0,
+        "images": len(_IMAGES),
+        "atlas_images": len(_ATLAS["images"]),
+        "sequences": len(_FRAMES),
+        "rotation_tables": len(_ROTATIONS),
+    }
+
+
+def clear():
+    """Drop every cached surface and reset the counters"""
+
+    _IMAGES.clear()
+    _FRAMES.clear()
+    _ROTATIONS.clear()
+    _DECODED.clear()
+    _ATLAS.update(loaded=False, images={}, sequences={})
+    STATS["hits"] = 0
+    STATS["misses"] = 0
@@ -0,0 +1,119 @@
+"""Packs the sprite images into a few atlas pages
+
+Run this after adding or changing any sprite image:
+
+    python atlas.py
+
+It writes assets/atlas-<n>.png and the manifest assets/atlas.json, which
+maps each original image path to its page and rect and each animation
+name to its frame paths. asset_cache serves images from the atlas when
+the manifest exists.
+"""
+import os
+import json
+import argparse
+import pygame
+import asset_cache
+
+PAGE_SIZE = 2048
+
+# Transparent gap between packed images
+PADDING = 1
+
+
+def pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    """Place rects of the given sizes on as few pages as possible
+
+    sizes maps a key to (width, height). Returns the placements, key ->
+    (page, x, y, width, height), and the (width, height) each page needs.
+    Uses shelf packing: tallest first, left to right in rows.
+    """
+
+    placements = {}
+    pages = []
+    page = x = y = shelf_height = 0
+    page_width = page_height = 0
+    for key, (width, height) in sorted(
+        sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])
+    ):
+        if width > page_size or height > page_size:
+            raise ValueError(f"{key} is larger than a {page_size} page")
+        if x + width > page_size:
+            # Start a new shelf
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        if y + height > page_size:
+            # Start a new page
+            pages.append((page_width, page_height))
+            page += 1
+            x = y = shelf_height = 0
+            page_width = page_height = 0
+        placements[key] = (page, x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        page_width = max(page_width, x - padding)
+        page_height = max(page_height, y + height)
+    pages.append((page_width, page_height))
+    return placements, pages
+
+
+def build(manifest_path=asset_cache.ATLAS_MANIFEST, page_size=PAGE_SIZE):
+    """Pack every animation frame and atlas image, write pages and manifest"""
+
+    animations = asset_cache.sequences()
+    paths = [path for frames in animations.values() for path in frames]
+    paths.extend(asset_cache.ATLAS_IMAGES)
+
+    images = {path: pygame.image.load(path) for path in dict.fromkeys(paths)}
+    placements, page_sizes = pack(
+        {path: image.get_size() for path, image in images.items()},
+        page_size,
+    )
+
+    pages = [
+        pygame.Surface(size, pygame.SRCALPHA, 32) for size in page_sizes
+    ]
+    for path, (page, x, y, _, _) in placements.items():
+        pages[page].blit(images[path], (x, y))
+
+    directory = os.path.dirname(manifest_path)
+    page_files = []
+    for number, surface in enumerate(pages):
+        page_file = f"atlas-{number}.png"
+        pygame.image.save(surface, os.path.join(directory, page_file))
+        page_files.append(page_file)
+
+    manifest = {
+        "pages": page_files,
+        "frames": placements,
+        "sequences": animations,
+    }
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--manifest", default=asset_cache.ATLAS_MANIFEST, help="output path"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PAGE_SIZE,
+        help="largest page width and height in pixels",
+    )
+    args = parser.parse_args()
+
+    manifest = build(args.manifest, args.page_size)
+    print(
+        f"packed {len(manifest['frames'])} images into "
+        f"{len(manifest['pages'])} pages"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Sound effects on reserved mixer channels
+
+Each category of effect gets its own group of reserved channels and a
+cap on how many copies of one effect may play at once. play() only
+queues the effect; flush() starts everything queued once per frame, so
+the same effect requested several times in a frame plays once. When a
+group is full, the new effect takes over the oldest voice of a lower
+priority category, or is dropped if there is none.
+
+pygame doesn't report mixer underruns, so the counters track what this
+module controls: requested, played, coalesced, stolen and dropped
+voices, and the most voices playing at once.
+"""
+import pygame
+
+# Categories
+SHOT = "shot"
+EXPLOSION = "explosion"
+POWER_UP = "power_up"
+
+# category: (reserved channels, voices per effect, priority)
+CATEGORIES = {
+    SHOT: (4, 3, 1),
+    EXPLOSION: (6, 4, 2),
+    POWER_UP: (2, 1, 3),
+}
+
+
+class AudioManager(object):
+    """Plays sound effects with per-category voice limits"""
+
+    def __init__(self, categories=CATEGORIES):
+        self.categories = categories
+        # category -> channel numbers, assigned on first use
+        self.groups = {}
+        self.channels = []
+        # Frame each channel last started a voice
+        self.started = []
+        self.frame = 0
+        # sound -> category, queued this frame
+        self.pending = {}
+        self.counters = {
+            "requested": 0,
+            "played": 0,
+            "coalesced": 0,
+            "stolen": 0,
+            "dropped": 0,
+            "peak_voices": 0,
+        }
+
+    def reserve(self):
+        """Set up the channel groups, once the mixer is running"""
+
+        total = sum(channels for channels, _, _ in self.categories.values())
+        pygame.mixer.set_num_channels(total)
+        # Keep Sound.play() and find_channel() off every channel
+        pygame.mixer.set_reserved(total)
+        self.channels = [pygame.mixer.Channel(i) for i in range(total)]
+        self.started = [0] * total
+        first = 0
+        for category, (channels, _, _) in self.categories.items():
+            self.groups[category] = range(first, first + channels)
+            first += channels
+
+    def play(self, sound, category):
+        """Queue sound to start at the end of the frame"""
+
+        self.counters["requested"] += 1
+        if sound in self.pending:
+            self.counters["coalesced"] += 1
+        else:
+            self.pending[sound] = category
+
+    def flush(self):
+        """Start the queued sounds, highest priority first"""
+
+        self.frame += 1
+        if not self.pending:
+            return
+        if not self.groups:
+            self.reserve()
+
+        queued = sorted(
+            self.pending.items(),
+            key=lambda item: self.categories[item[1]][2],
+            reverse=True,
+        )
+        self.pending = {}
+        for sound, category in queued:
+            number = self.voice_for(sound, category)
+            if number is None:
+                self.counters["dropped"] += 1
+                continue
+            self.channels[number].play(sound)
+            self.started[number] = self.frame
+            self.counters["played"] += 1
+
+        voices = sum(channel.get_busy() for channel in self.channels)
+        if voices > self.counters["peak_voices"]:
+            self.counters["peak_voices"] = voices
+
+    def voice_for(self, sound, category):
+        """Return the channel number to play sound on, or None"""
+
+        _, max_voices, priority = self.categories[category]
+        group = self.groups[category]
+
+        # Over the effect's cap the oldest copy restarts
+        voices = [
+            number
+            for number in group
+            if self.channels[number].get_busy()
+            and self.channels[number].get_sound() is sound
+        ]
+        if len(voices) >= max_voices:
+            self.counters["stolen"] += 1
+            return min(voices, key=self.started.__getitem__)
+
+        for number in group:
+            if not self.channels[number].get_busy():
+                return number
+
+        # Borrow an idle channel of a lower priority category, or else
+        # take the oldest voice of the lowest one
+        victims = [
+            (
+                self.channels[number].get_busy(),
+                other_priority,
+                self.started[number],
+                number,
+            )
+            for other, (_, _, other_priority) in self.categories.items()
+            if other_priority < priority
+            for number in self.groups[other]
+        ]
+        if not victims:
+            return None
+        busy, _, _, number = min(victims)
+        if busy:
+            self.counters["stolen"] += 1
+        return number
+
+    def stats(self):
+        """Counters for tuning the channel groups, plus voices playing now"""
+
+        stats = dict(self.counters)
+        stats["voices"] = sum(channel.get_busy() for channel in self.channels)
+        return stats
+
+
+MANAGER = AudioManager()
+
+
+def play(sound, category):
+    """Queue sound on the shared audio manager"""
+    MANAGER.play(sound, category)
+
+
+def flush():
+    """Start the sounds queued this frame"""
+    MANAGER.flush()
+
+
+def stats():
+    """Counters of the shared audio manager"""
+    return MANAGER.stats()
@@ -0,0 +1,373 @@
+"""Scenario benchmarks for the frame pipeline
+
+Each scenario keeps a fixed population on screen (missiles of every type,
+projectiles, explosions and power ups), topping it up as sprites die, and
+runs the session's own step(), draw() and flip() every frame. The phase
+times come from the session's profiler. Results can be saved as a baseline
+and later runs compared against it. The *_store scenarios keep missiles,
+projectiles and power ups in an entity_store.EntityStore.
+
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --compare benchmark_baseline.json
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+import sys
+import json
+import random
+import argparse
+import tracemalloc
+import pygame
+import global_variables as G
+import sprites
+import entity_store
+import profiler as prof
+from session import GameSession
+
+PHASES = list(prof.PHASE_NAMES)
+
+# missiles is per missile type
+SCENARIOS = {
+    "idle": {"missiles": 0, "projectiles": 0, "explosions": 0, "power_ups": 0},
+    "early_round": {
+        "missiles": 2,
+        "projectiles": 3,
+        "explosions": 2,
+        "power_ups": 1,
+    },
+    "busy": {
+        "missiles": 20,
+        "projectiles": 30,
+        "explosions": 15,
+        "power_ups": 4,
+    },
+    "late_wave": {
+        "missiles": 100,
+        "projectiles": 60,
+        "explosions": 40,
+        "power_ups": 4,
+    },
+    "late_wave_store": {
+        "missiles": 100,
+        "projectiles": 60,
+        "explosions": 40,
+        "power_ups": 4,
+        "entity_store": True,
+    },
+    "swarm": {
+        "missiles": 700,
+        "projectiles": 300,
+        "explosions": 40,
+        "power_ups": 4,
+    },
+    "swarm_store": {
+        "missiles": 700,
+        "projectiles": 300,
+        "explosions": 40,
+        "power_ups": 4,
+        "entity_store": True,
+    },
+}
+
+
+class Scenario(object):
+    """A session kept at a fixed population of sprites"""
+
+    def __init__(
+        self,
+        name,
+        missiles,
+        projectiles,
+        explosions,
+        power_ups,
+        entity_store=False,
+    ):
+        self.name = name
+        self.missiles = missiles
+        self.projectiles = projectiles
+        self.explosions = explosions
+        self.power_ups = power_ups
+        self.rng = random.Random(name)
+
+        G.DIFFICULTY = 1
+        G.SCORE = 0
+        self.session = GameSession(
+            audio=False, seed=0, entity_store=entity_store
+        )
+        # The scenario decides what spawns, not the wave
+        self.session.spawner.clear()
+        self.missiles_by_type = {
+            missile_type: pygame.sprite.Group()
+            for missile_type in (1, 2, 3)
+        }
+        self.explosion_list = pygame.sprite.Group()
+
+    def spawn(self):
+        """Top every population back up to its target size"""
+
+        if self.session.store is not None:
+            self.spawn_store()
+            return
+
+        session = self.session
+        rng = self.rng
+        for missile_type, group in self.missiles_by_type.items():
+            for _ in range(self.missiles - len(group)):
+                missile = sprites.Missile(
+                    (
+                        rng.randrange(G.DISPLAY_WIDTH),
+                        rng.randrange(-200, G.DISPLAY_HEIGHT // 2),
+                    ),
+                    missile_type,
+                )
+                group.add(missile)
+                session.all_sprites_list.add(missile)
+                session.missile_list.add(missile)
+                session.missile_grid.insert(missile)
+                session.animator.add(missile)
+
+        for _ in range(self.projectiles - len(session.projectile_list)):
+            projectile = sprites.Projectile(
+                (rng.randrange(G.DISPLAY_WIDTH), G.DISPLAY_HEIGHT * 0.875),
+                rng.randrange(-70, 71),
+            )
+            session.all_sprites_list.add(projectile)
+            session.projectile_list.add(projectile)
+
+        self.spawn_explosions()
+
+        for _ in range(self.power_ups - len(session.power_up_list)):
+            power_up = sprites.Power_Up(
+                (
+                    rng.randrange(G.DISPLAY_WIDTH),
+                    rng.randrange(G.DISPLAY_HEIGHT // 2),
+                ),
+                rng.choice(sprites.Power_Up.power_up_list),
+            )
+            session.all_sprites_list.add(power_up)
+            session.power_up_list.add(power_up)
+            session.power_up_grid.insert(power_up)
+            session.animator.add(power_up)
+
+    def spawn_store(self):
+        """spawn() for scenarios running on the entity store"""
+
+        store = self.session.store
+        rng = self.rng
+        for missile_type in (1, 2, 3):
+            missing = self.missiles - store.count_of(
+                entity_store.MISSILE, missile_type
+            )
+            for _ in range(missing):
+                store.spawn_missile(
+                    (
+                        rng.randrange(G.DISPLAY_WIDTH),
+                        rng.randrange(-200, G.DISPLAY_HEIGHT // 2),
+                    ),
+                    missile_type,
+                )
+
+        missing = self.projectiles - store.count_of(entity_store.PROJECTILE)
+        for _ in range(missing):
+            store.spawn_projectile(
+                (rng.randrange(G.DISPLAY_WIDTH), G.DISPLAY_HEIGHT * 0.875),
+                rng.randrange(-70, 71),
+            )
+
+        self.spawn_explosions()
+
+        missing = self.power_ups - store.count_of(entity_store.POWER_UP)
+        for _ in range(missing):
+            store.spawn_power_up(
+                (
+                    rng.randrange(G.DISPLAY_WIDTH),
+                    rng.randrange(G.DISPLAY_HEIGHT // 2),
+                ),
+                rng.choice(sprites.Power_Up.power_up_list),
+            )
+
+    def spawn_explosions(self):
+        """Top the explosions up, they are sprites either way"""
+
+        session = self.session
+        rng = self.rng
+        for _ in range(self.explosions - len(self.explosion_list)):
+            explosion = sprites.Missile_Explosion(
+                (
+                    rng.randrange(G.DISPLAY_WIDTH),
+                    rng.randrange(G.DISPLAY_HEIGHT),
+                ),
+                rng.randrange(1, 4),
+            )
+            self.explosion_list.add(explosion)
+            session.all_sprites_list.add(explosion)
+            session.animator.add(explosion)
+
+    def frame(self, timings):
+        """Run one frame, appending each phase's seconds to timings
+
+        The frame is the one GameScene runs for a single tick: events,
+        then GameSession.step(), draw() and flip(), timed by the
+        session's profiler. Topping the population up counts as spawning.
+        """
+
+        session = self.session
+        profiler = session.profiler
+
+        profiler.begin()
+        pygame.event.get()
+        profiler.mark(prof.EVENTS)
+        self.spawn()
+        profiler.mark(prof.SPAWN)
+        session.step()
+        session.draw()
+        session.flip()
+        profiler.end()
+
+        # Missiles that land must not end the scenario
+        session.player.health = session.player.max_health
+        session.game_over = False
+
+        for phase, seconds in zip(PHASES, profiler.current):
+            timings[phase].append(seconds)
+        timings["frame"].append(sum(profiler.current))
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p95/p99 of a list of seconds, in milliseconds"""
+    return {
+        "p50": percentile(samples, 0.50) * 1000,
+        "p95": percentile(samples, 0.95) * 1000,
+        "p99": percentile(samples, 0.99) * 1000,
+    }
+
+
+def run_scenario(name, frames=600, warmup=60, alloc_frames=60):
+    """Benchmark one scenario and return its summary"""
+
+    scenario = Scenario(name, **SCENARIOS[name])
+    timings = {phase: [] for phase in PHASES + ["frame"]}
+    for _ in range(warmup):
+        scenario.frame({phase: [] for phase in timings})
+    for _ in range(frames):
+        scenario.frame(timings)
+
+    # Allocation tracing slows everything down, so it gets its own pass.
+    # Clearing the traces before each frame also resets the peak, so the
+    # peak is how much the frame allocated on top of what it started
+    # with, and the blocks still traced after it are its allocations that
+    # are still alive, leaving out churn freed within the frame.
+    allocated = []
+    blocks = []
+    tracemalloc.start()
+    for _ in range(alloc_frames):
+        tracemalloc.clear_traces()
+        scenario.frame({phase: [] for phase in timings})
+        allocated.append(tracemalloc.get_traced_memory()[1])
+        blocks.append(len(tracemalloc.take_snapshot().traces))
+    tracemalloc.stop()
+
+    result = summarize(timings["frame"])
+    result["phases"] = {
+        phase: summarize(timings[phase]) for phase in PHASES
+    }
+    result["alloc_kib_per_frame"] = sum(allocated) / len(allocated) / 1024
+    result["alloc_blocks_per_frame"] = sum(blocks) / len(blocks)
+    counts = scenario.session.entity_counts()
+    # Plus the gun
+    result["sprites"] = sum(counts.values()) + 1
+    return result
+
+
+def print_results(results):
+    """Print a table of frame and phase p95s"""
+
+    header = f"{'scenario':<16}{'sprites':>8}{'p50':>8}{'p95':>8}{'p99':>8}"
+    header += "".join(f"{phase:>10}" for phase in PHASES)
+    header += f"{'KiB':>8}{'blocks':>8}"
+    print(header)
+    for name, result in results.items():
+        line = (
+            f"{name:<16}{result['sprites']:>8}{result['p50']:>8.2f}"
+            f"{result['p95']:>8.2f}{result['p99']:>8.2f}"
+        )
+        line += "".join(
+            f"{result['phases'][phase]['p95']:>10.3f}" for phase in PHASES
+        )
+        line += f"{result['alloc_kib_per_frame']:>8.1f}"
+        line += f"{result['alloc_blocks_per_frame']:>8.1f}"
+        print(line)
+    print(
+        "times in ms, phases at p95, KiB = peak traced bytes per frame, "
+        "blocks = new allocations still alive after a frame"
+    )
+
+
+def compare(results, baseline, threshold):
+    """Print p95 changes against a baseline, return True on regression"""
+
+    regressed = False
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["p95"]
+        change = (result["p95"] - before) / before * 100 if before else 0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:<16} p95 {before:.2f} -> {result['p95']:.2f} ms "
+            f"({change:+.1f}%){flag}"
+        )
+    return regressed
+
+
+def main():
+    """Run the benchmark suite from the command line"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "scenarios", nargs="*", default=list(SCENARIOS), metavar="SCENARIO"
+    )
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="p95 slowdown in percent that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        name: run_scenario(name, args.frames) for name in args.scenarios
+    }
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
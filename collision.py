@@ -0,0 +1,97 @@
+"""Broad-phase collision detection"""
+import pygame
+
+
+class SpatialHash(object):
+    """Uniform grid that buckets sprites by the cells their rects cover
+
+    Sprites are re-bucketed only when they cross a cell boundary, so
+    keeping the grid current costs one comparison per sprite per frame.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        # (column, row) -> set of sprites overlapping that cell
+        self.cells = {}
+        # sprite -> the cells it was last bucketed into
+        self.sprite_cells = {}
+
+    def __len__(self):
+        return len(self.sprite_cells)
+
+    def cells_for(self, rect):
+        """Return the cells rect overlaps"""
+
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return tuple((column, row) for column in columns for row in rows)
+
+    def insert(self, sprite):
+        """Start tracking sprite"""
+
+        cells = self.cells_for(sprite.rect)
+        self.sprite_cells[sprite] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(sprite)
+
+    def remove(self, sprite):
+        """Stop tracking sprite"""
+
+        for cell in self.sprite_cells.pop(sprite, ()):
+            bucket = self.cells[cell]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, sprite):
+        """Re-bucket sprite if it crossed into different cells"""
+
+        cells = self.cells_for(sprite.rect)
+        if self.sprite_cells.get(sprite) != cells:
+            self.remove(sprite)
+            self.sprite_cells[sprite] = cells
+            for cell in cells:
+                self.cells.setdefault(cell, set()).add(sprite)
+
+    def update(self, sprites):
+        """Re-bucket every sprite in an iterable after they moved"""
+        for sprite in sprites:
+            self.move(sprite)
+
+    def query(self, rect):
+        """Return every tracked sprite sharing a cell with rect"""
+
+        candidates = set()
+        for cell in self.cells_for(rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+    def collide(self, sprite, dokill):
+        """Drop-in for pygame.sprite.spritecollide against the grid"""
+
+        hits = [
+            target
+            for target in self.query(sprite.rect)
+            if target.alive() and sprite.rect.colliderect(target.rect)
+        ]
+        if dokill:
+            for target in hits:
+                target.kill()
+                self.remove(target)
+        return hits
+
+    def draw_debug(self, surface, color=(0, 255, 0)):
+        """Outline every occupied cell, thicker the more sprites it holds"""
+
+        size = self.cell_size
+        for (column, row), bucket in self.cells.items():
+            width = min(len(bucket), 4)
+            pygame.draw.rect(
+                surface,
+                color,
+                (column * size, row * size, size, size),
+                width,
+            )
@@ -0,0 +1,385 @@
+"""Structure-of-arrays store for large missile, projectile and power up
+populations
+
+Every entity lives in a slot of a set of parallel NumPy arrays, so moving,
+animating and colliding the whole population is a handful of vectorized
+operations instead of one Python call per sprite. Speeds, sizes and
+animation timing come from the sprite classes, so a round played through
+the store follows the same rules as one played with sprites. NumPy is
+optional; the sprite based game loop does not need it.
+"""
+from math import cos, sin, radians
+import global_variables as G
+import asset_cache
+from sprites import Missile, Power_Up
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Entity kinds
+MISSILE = 0
+PROJECTILE = 1
+POWER_UP = 2
+
+# Events returned by EntityStore.collide, as (event, subtype, center).
+# The subtype is the missile type, or the index of the power up in
+# Power_Up.power_up_list.
+MISSILE_HIT = "missile_hit"
+MISSILE_LANDED = "missile_landed"
+POWER_UP_HIT = "power_up_hit"
+
+PROJECTILE_SPEED = 5
+
+# Shooting this power up makes the rest of the tick's projectiles pierce,
+# as GameSession.collect_power_up does in the middle of the sprite loop
+PIERCING_ROUNDS = [
+    power_up["type"] for power_up in Power_Up.power_up_list
+].index("piercing_rounds")
+
+
+class EntityStore(object):
+    """Missiles, projectiles and power ups held in parallel NumPy arrays
+
+    move() advances every entity one tick and collide() resolves hits,
+    landings and projectiles leaving the screen, returning the events
+    for GameSession to apply. Animations run on the store's own game
+    clock, like animation.Animator.
+    """
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise RuntimeError("EntityStore needs numpy to be installed")
+        self.capacity = 0
+        self.count = 0
+        self.free = []
+        self.time = 0.0
+        self.piercing_rounds = False
+        # Entities spawned so far, which numbers them in spawn order
+        self.spawned = 0
+        # Frame tuples the slots animate through, and their indices
+        self.sequences = []
+        self.sequence_ids = {}
+        # Rects blitted last frame, to be erased by the next one
+        self.drawn = []
+        self.pos = np.zeros((0, 2), dtype=np.float32)
+        self.prev_pos = np.zeros((0, 2), dtype=np.float32)
+        self.draw_pos = np.zeros((0, 2), dtype=np.float32)
+        self.vel = np.zeros((0, 2), dtype=np.float32)
+        self.size = np.zeros((0, 2), dtype=np.float32)
+        self.kind = np.zeros(0, dtype=np.int8)
+        self.subtype = np.zeros(0, dtype=np.int8)
+        self.sequence = np.zeros(0, dtype=np.int16)
+        self.anim_start = np.zeros(0, dtype=np.float64)
+        self.frame_time = np.zeros(0, dtype=np.float32)
+        self.frame_count = np.zeros(0, dtype=np.int16)
+        self.frame = np.zeros(0, dtype=np.int16)
+        self.alive = np.zeros(0, dtype=bool)
+        self.serial = np.zeros(0, dtype=np.int64)
+        self._grow(capacity)
+
+    def __len__(self):
+        return int(self.alive[: self.count].sum())
+
+    def _grow(self, capacity):
+        """Resize every array to capacity, keeping existing slots"""
+
+        def resized(array):
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: self.capacity] = array
+            return grown
+
+        self.pos = resized(self.pos)
+        self.prev_pos = resized(self.prev_pos)
+        self.draw_pos = resized(self.draw_pos)
+        self.vel = resized(self.vel)
+        self.size = resized(self.size)
+        self.kind = resized(self.kind)
+        self.subtype = resized(self.subtype)
+        self.sequence = resized(self.sequence)
+        self.anim_start = resized(self.anim_start)
+        self.frame_time = resized(self.frame_time)
+        self.frame_count = resized(self.frame_count)
+        self.frame = resized(self.frame)
+        self.alive = resized(self.alive)
+        self.serial = resized(self.serial)
+        self.capacity = capacity
+
+    def _allocate(self):
+        """Return a free slot, growing the arrays when full"""
+
+        if self.free:
+            return self.free.pop()
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        self.count += 1
+        return self.count - 1
+
+    def _kill(self, slots):
+        # A slot killed twice must only go back on the free list once
+        slots = slots[self.alive[slots]]
+        self.alive[slots] = False
+        self.free.extend(slots.tolist())
+
+    def _add(self, kind, subtype, center, vel, frames, frame_time):
+        """Fill a free slot with an entity centered on center"""
+
+        sequence = self.sequence_ids.get(frames)
+        if sequence is None:
+            sequence = self.sequence_ids[frames] = len(self.sequences)
+            self.sequences.append(frames)
+        width, height = frames[0].get_size()
+        slot = self._allocate()
+        self.pos[slot] = (center[0] - width // 2, center[1] - height // 2)
+        self.prev_pos[slot] = self.draw_pos[slot] = self.pos[slot]
+        self.vel[slot] = vel
+        self.size[slot] = (width, height)
+        self.kind[slot] = kind
+        self.subtype[slot] = subtype
+        self.sequence[slot] = sequence
+        self.anim_start[slot] = self.time
+        self.frame_time[slot] = frame_time
+        self.frame_count[slot] = len(frames)
+        self.frame[slot] = 0
+        self.alive[slot] = True
+        self.serial[slot] = self.spawned
+        self.spawned += 1
+        return slot
+
+    def spawn_missile(self, pos, missile_type):
+        """Add a missile centered on pos, return its slot"""
+
+        speed = Missile.missile_stats[missile_type - 1]["speed"]
+        return self._add(
+            MISSILE,
+            missile_type,
+            pos,
+            (0, speed * G.TICK_SCALE),
+            asset_cache.missile_frames(missile_type),
+            Missile.frame_time,
+        )
+
+    def spawn_projectile(self, pos, angle, initial_offset=0):
+        """Add a projectile fired from pos at angle, return its slot"""
+
+        center = (
+            pos[0] - round(initial_offset * sin(radians(angle))),
+            pos[1] - round(initial_offset * cos(radians(angle))),
+        )
+        vel = (
+            -round(PROJECTILE_SPEED * sin(radians(angle))) * G.TICK_SCALE,
+            -round(PROJECTILE_SPEED * cos(radians(angle))) * G.TICK_SCALE,
+        )
+        return self._add(
+            PROJECTILE,
+            0,
+            center,
+            vel,
+            (asset_cache.projectile_image(),),
+            1.0,
+        )
+
+    def spawn_power_up(self, pos, power_up):
+        """Add a power up, one of Power_Up.power_up_list, centered on pos"""
+
+        return self._add(
+            POWER_UP,
+            Power_Up.power_up_list.index(power_up),
+            pos,
+            (0, 0),
+            asset_cache.power_up_frames(power_up["color"]),
+            Power_Up.frame_time,
+        )
+
+    def _centers(self, slots):
+        centers = self.pos[slots] + self.size[slots] // 2
+        return [(int(x), int(y)) for x, y in centers]
+
+    def _slots(self, kind):
+        count = self.count
+        return np.flatnonzero(self.alive[:count] & (self.kind[:count] == kind))
+
+    def count_of(self, kind, subtype=None):
+        """Number of live entities of kind, and of subtype if given"""
+
+        slots = self._slots(kind)
+        if subtype is not None:
+            slots = slots[self.subtype[slots] == subtype]
+        return int(slots.size)
+
+    def move(self, dt):
+        """Advance every entity one tick of dt seconds"""
+
+        self.time += dt
+        count = self.count
+        self.prev_pos[:count] = self.pos[:count]
+        self.pos[:count] += self.vel[:count]
+        self.draw_pos[:count] = self.pos[:count]
+        elapsed = self.time - self.anim_start[:count]
+        self.frame[:count] = (
+            (elapsed / self.frame_time[:count]).astype(np.int32)
+            % self.frame_count[:count]
+        )
+
+    def _overlap(self, first, second):
+        """Projectile by target AABB overlap matrix of two slot arrays"""
+
+        pos = self.pos
+        a_min = pos[first]
+        a_max = a_min + self.size[first]
+        b_min = pos[second]
+        b_max = b_min + self.size[second]
+        return (
+            (a_min[:, None, 0] < b_max[None, :, 0])
+            & (a_max[:, None, 0] > b_min[None, :, 0])
+            & (a_min[:, None, 1] < b_max[None, :, 1])
+            & (a_max[:, None, 1] > b_min[None, :, 1])
+        )
+
+    def _events(self, event, slots):
+        return [
+            (event, subtype, center)
+            for subtype, center in zip(
+                self.subtype[slots].tolist(), self._centers(slots)
+            )
+        ]
+
+    def collide(self):
+        """Resolve this tick's hits and return the resulting events
+
+        Projectiles are resolved one at a time in the order they were
+        fired, like the sprite loop in GameSession.collide: each one hits
+        every missile it overlaps that is still up, then shoots the power
+        ups it overlaps, even if a missile already stopped it. Missiles
+        that landed come last. Slots are reused, so the firing order comes
+        from the serial numbers, not the slots.
+        """
+
+        missiles = self._slots(MISSILE)
+        projectiles = self._slots(PROJECTILE)
+        power_ups = self._slots(POWER_UP)
+        projectiles = projectiles[
+            np.argsort(self.serial[projectiles], kind="stable")
+        ]
+        events = []
+
+        missile_hits = self._overlap(projectiles, missiles)
+        power_up_hits = self._overlap(projectiles, power_ups)
+        missiles_up = np.ones(missiles.size, dtype=bool)
+        power_ups_up = np.ones(power_ups.size, dtype=bool)
+        piercing = self.piercing_rounds
+        # Only the few projectiles touching something need the Python loop
+        touching = missile_hits.any(axis=1) | power_up_hits.any(axis=1)
+        for row in np.flatnonzero(touching).tolist():
+            hit = np.flatnonzero(missile_hits[row] & missiles_up)
+            if hit.size:
+                missiles_up[hit] = False
+                events.extend(self._events(MISSILE_HIT, missiles[hit]))
+                if not piercing:
+                    self._kill(projectiles[row : row + 1])
+            shot = np.flatnonzero(power_up_hits[row] & power_ups_up)
+            if shot.size:
+                power_ups_up[shot] = False
+                events.extend(self._events(POWER_UP_HIT, power_ups[shot]))
+                if PIERCING_ROUNDS in self.subtype[power_ups[shot]]:
+                    piercing = True
+        self._kill(missiles[~missiles_up])
+        self._kill(power_ups[~power_ups_up])
+        missiles = missiles[missiles_up]
+        projectiles = projectiles[self.alive[projectiles]]
+
+        if missiles.size:
+            landed = missiles[
+                self.pos[missiles, 1]
+                > G.DISPLAY_HEIGHT - self.size[missiles, 1] * 0.8
+            ]
+            if landed.size:
+                events.extend(self._events(MISSILE_LANDED, landed))
+                self._kill(landed)
+
+        if projectiles.size:
+            x = self.pos[projectiles, 0]
+            y = self.pos[projectiles, 1]
+            gone = projectiles[
+                (x > G.DISPLAY_WIDTH)
+                | (x < 0)
+                | (y > G.DISPLAY_HEIGHT)
+                | (y < 0)
+            ]
+            if gone.size:
+                self._kill(gone)
+
+        return events
+
+    def kill(self, slots):
+        """Remove entities by slot"""
+        self._kill(np.asarray(slots, dtype=np.intp))
+
+    def clear(self):
+        """Remove every entity"""
+        self.kill(np.flatnonzero(self.alive[: self.count]))
+
+    def interpolate(self, alpha):
+        """Draw moving entities between the last two ticks"""
+
+        count = self.count
+        self.draw_pos[:count] = (
+            self.prev_pos[:count]
+            + (self.pos[:count] - self.prev_pos[:count]) * alpha
+        )
+
+    def observe(self):
+        """Lists in the format of GameSession.observe"""
+
+        missiles = self._slots(MISSILE)
+        projectiles = self._slots(PROJECTILE)
+        power_ups = self._slots(POWER_UP)
+        return {
+            "missiles": [
+                (missile_type, x, y)
+                for missile_type, (x, _), y in zip(
+                    self.subtype[missiles].tolist(),
+                    self._centers(missiles),
+                    self.pos[missiles, 1].tolist(),
+                )
+            ],
+            "projectiles": [
+                tuple(pos) for pos in self.pos[projectiles].tolist()
+            ],
+            "power_ups": [
+                (Power_Up.power_up_list[index]["type"],) + center
+                for index, center in zip(
+                    self.subtype[power_ups].tolist(),
+                    self._centers(power_ups),
+                )
+            ],
+        }
+
+    def erase(self, renderer):
+        """Restore the background under last frame's entities
+
+        Returns the erased rects so widgets underneath can redraw.
+        """
+
+        erased = self.drawn
+        for rect in erased:
+            renderer.erase(rect)
+        self.drawn = []
+        return erased
+
+    def draw(self, renderer):
+        """Blit every live entity in one Surface.blits call"""
+
+        slots = np.flatnonzero(self.alive[: self.count])
+        sequences = self.sequences
+        self.drawn = renderer.blits(
+            [
+                (sequences[sequence][frame], (round(x), round(y)))
+                for sequence, frame, (x, y) in zip(
+                    self.sequence[slots].tolist(),
+                    self.frame[slots].tolist(),
+                    self.draw_pos[slots].tolist(),
+                )
+            ]
+        )
@@ -1,23 +1,30 @@
 """This module contains any helper functions"""
 import sys
 import pygame
+from text_cache import render_text
+import persistence
 
 
 def exit_game():
-    """Exits the game"""
+    """Exits the game once pending writes are on disk"""
+    persistence.flush()
     pygame.quit()
     sys.exit()
 
 
 def text_objects(text, font, color, pos):
     """Return text surface and rect"""
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(text, font, color)
     text_rect = text_surface.get_rect(center=pos)
     return text_surface, text_rect
 
 
+# Fibonacci numbers computed so far
+_FIB = [0, 1]
+
+
 def fib(index):
-    """recursive fibonacci sequence function"""
-    if index <= 1:
-        return index
-    return fib(index - 1) + fib(index - 2)
+    """fibonacci sequence function, remembering every number it computes"""
+    while len(_FIB) <= index:
+        _FIB.append(_FIB[-1] + _FIB[-2])
+    return _FIB[index]
@@ -1,9 +1,29 @@
-"""Global constants and state variables"""
+"""Global constants and state variables
+
+Importing this module has no side effects. pygame, the window, fonts,
+sounds and backgrounds are created by the loaders registered below the
+first time one of their names is read, and are plain module attributes
+from then on. How long each one took is kept in STARTUP_TIMES.
+"""
+from time import perf_counter
 import pygame
 
-# Init
-pygame.mixer.pre_init(22100, -16, 2, 64)
-pygame.init()
+STARTED = perf_counter()
+
+# Cold start to first frame should stay under this many seconds
+STARTUP_BUDGET = 1.0
+
+# Seconds spent creating each lazy resource, in load order
+STARTUP_TIMES = {}
+
+# Seconds from importing this module to the first drawn frame
+FIRST_FRAME_TIME = None
+
+# Print the startup report even when startup was within budget
+SHOW_STARTUP_REPORT = False
+
+# Lazy globals: name -> function returning the value
+_LOADERS = {}
 
 # Screen width and height
 DISPLAY_WIDTH = 800
@@ -18,34 +38,23 @@ RED = (255, 0, 0)
 LIGHT_YELLOW = (247, 241, 49)
 GOLD = (255, 215, 0)
 
-# Text
-GIANT_TEXT = pygame.font.SysFont("freesans", 115, bold=True)
-BIG_TEXT = pygame.font.SysFont("freesans", 80, bold=True)
-MEDIUM_TEXT = pygame.font.SysFont("freesans", 30, bold=True)
-SMALL_TEXT = pygame.font.SysFont("freesans", 20, bold=True)
-SMALL_ITALIC_TEXT = pygame.font.SysFont("freesans", 20, italic=True)
-TINY_TEXT = pygame.font.SysFont("freesans", 14, bold=True)
-
-# Sound Effects
-SHOOT_FX = pygame.mixer.Sound("assets/audio/laser.wav")
-EXPLOSION_FX = pygame.mixer.Sound("assets/audio/explosion.wav")
-POWER_UP_1_FX = pygame.mixer.Sound("assets/audio/power_up_1.wav")
-POWER_UP_2_FX = pygame.mixer.Sound("assets/audio/power_up_2.wav")
-POWER_UP_3_FX = pygame.mixer.Sound("assets/audio/power_up_3.wav")
-POWER_UP_FX_LIST = [POWER_UP_1_FX, POWER_UP_2_FX, POWER_UP_3_FX]
+# Simulation ticks per second. Sprite speeds are tuned in pixels per tick
+# at 60 ticks a second and scaled by TICK_SCALE for other rates.
+TICK_RATE = 60
+TICK_SCALE = 60 / TICK_RATE
 
-# Display
-SCREEN = pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
-ICON = pygame.image.load("assets/gun_icon.png").convert_alpha()
-pygame.display.set_caption("RAstral Rampart")
-pygame.display.set_icon(ICON)
-
-# Clock
-CLOCK = pygame.time.Clock()
+# Upper bound on rendered frames per second
+MAX_FPS = 144
 
 # Pause
 PAUSE = False
 
+# Draw the collision grid over the game (toggled with F3)
+DEBUG_COLLISION = False
+
+# Show the frame timing overlay (toggled with F2)
+SHOW_PROFILER = False
+
 # Difficulty setting
 DIFFICULTY = 1
 
@@ -65,5 +74,147 @@ class Background(
         self.rect.left, self.rect.top = location
 
 
-BACKGROUND_1 = Background("assets/space/space-1.png", [0, 0])
-BACKGROUND_2 = Background("assets/space/space-2.png", [0, 0])
+def __getattr__(name):
+    if name not in _LOADERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _load(name)
+
+
+def _load(name):
+    """Return the lazy global name, creating it on first use"""
+
+    if name not in globals():
+        start = perf_counter()
+        value = _LOADERS[name]()
+        STARTUP_TIMES[name] = perf_counter() - start
+        globals()[name] = value
+    return globals()[name]
+
+
+def resource(name):
+    """Register the decorated function as the loader for name"""
+
+    def register(loader):
+        _LOADERS[name] = loader
+        return loader
+
+    return register
+
+
+def init():
+    """Initialize pygame, once"""
+
+    if not pygame.get_init():
+        start = perf_counter()
+        # 512 samples is about 23 ms, enough to keep the mixer from
+        # underrunning when many effects play at once
+        pygame.mixer.pre_init(22100, -16, 2, 512)
+        pygame.init()
+        STARTUP_TIMES["pygame"] = perf_counter() - start
+
+
+def init_display():
+    """Open the window if it isn't open yet and return it"""
+    return _load("SCREEN")
+
+
+# Display
+@resource("SCREEN")
+def _screen():
+    init()
+    screen = pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    pygame.display.set_caption("RAstral Rampart")
+    # The icon can only be converted once the window exists
+    icon = pygame.image.load("assets/gun_icon.png").convert_alpha()
+    pygame.display.set_icon(icon)
+    globals()["ICON"] = icon
+    return screen
+
+
+@resource("ICON")
+def _icon():
+    init_display()
+    return globals()["ICON"]
+
+
+# Clock
+@resource("CLOCK")
+def _clock():
+    return pygame.time.Clock()
+
+
+# Text
+def _font(name, size, **style):
+    @resource(name)
+    def load():
+        init()
+        return pygame.font.SysFont("freesans", size, **style)
+
+
+_font("GIANT_TEXT", 115, bold=True)
+_font("BIG_TEXT", 80, bold=True)
+_font("MEDIUM_TEXT", 30, bold=True)
+_font("SMALL_TEXT", 20, bold=True)
+_font("SMALL_ITALIC_TEXT", 20, italic=True)
+_font("TINY_TEXT", 14, bold=True)
+
+
+# Sound Effects
+def _sound(name, path):
+    @resource(name)
+    def load():
+        init()
+        return pygame.mixer.Sound(path)
+
+
+_sound("SHOOT_FX", "assets/audio/laser.wav")
+_sound("EXPLOSION_FX", "assets/audio/explosion.wav")
+_sound("POWER_UP_1_FX", "assets/audio/power_up_1.wav")
+_sound("POWER_UP_2_FX", "assets/audio/power_up_2.wav")
+_sound("POWER_UP_3_FX", "assets/audio/power_up_3.wav")
+
+
+@resource("POWER_UP_FX_LIST")
+def _power_up_fx_list():
+    return [
+        _load("POWER_UP_1_FX"),
+        _load("POWER_UP_2_FX"),
+        _load("POWER_UP_3_FX"),
+    ]
+
+
+# Backgrounds
+def _background(name, image_file):
+    @resource(name)
+    def load():
+        init_display()
+        return Background(image_file, [0, 0])
+
+
+_background("BACKGROUND_1", "assets/space/space-1.png")
+_background("BACKGROUND_2", "assets/space/space-2.png")
+
+
+def first_frame():
+    """Note the first drawn frame and warn if startup ran over budget"""
+
+    global FIRST_FRAME_TIME  # pylint: disable=global-statement
+    if FIRST_FRAME_TIME is None:
+        FIRST_FRAME_TIME = perf_counter() - STARTED
+        if SHOW_STARTUP_REPORT or FIRST_FRAME_TIME > STARTUP_BUDGET:
+            print(startup_report())
+
+
+def startup_report():
+    """Return a summary of where the startup time went"""
+
+    lines = ["Startup"]
+    for name, seconds in STARTUP_TIMES.items():
+        lines.append(f"  {name:<20} {seconds * 1000:8.1f} ms")
+    if FIRST_FRAME_TIME is not None:
+        verdict = "over" if FIRST_FRAME_TIME > STARTUP_BUDGET else "within"
+        lines.append(
+            f"  first frame after {FIRST_FRAME_TIME * 1000:.1f} ms, "
+            f"{verdict} the {STARTUP_BUDGET * 1000:.0f} ms budget"
+        )
+    return "\n".join(lines)
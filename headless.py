@@ -0,0 +1,109 @@
+"""Runs rounds without a window, as fast as the CPU allows
+
+Import this module before anything else touches pygame so SDL picks up
+the dummy video and audio drivers.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+import argparse
+import time
+import global_variables as G
+from session import GameSession, FIRE
+import replay
+
+
+def autopilot(observation):
+    """Default policy: fire whenever there is ammo and a missile is up"""
+
+    if observation["ammo"] > 0 and observation["missiles"]:
+        return [FIRE]
+    return []
+
+
+def simulate_round(
+    difficulty=1,
+    max_ticks=60 * 60 * 10,
+    policy=autopilot,
+    seed=None,
+    record_to=None,
+    entity_store=False,
+):
+    """Play one round headless and return its final observation"""
+
+    G.DIFFICULTY = difficulty
+    G.SCORE = 0
+    G.PERMANENT_POWER_UPS["higher_max_health"] = 0
+    G.PERMANENT_POWER_UPS["higher_max_ammo"] = 0
+    session = GameSession(
+        render=False, audio=False, seed=seed, entity_store=entity_store
+    )
+    recorder = replay.ReplayRecorder(session)
+    observation = session.observe()
+    while session.tick < max_ticks:
+        inputs = policy(observation)
+        session.step(inputs)
+        recorder.record(session.tick, inputs)
+        observation = session.observe()
+        if session.game_over or session.round_over:
+            break
+    if record_to:
+        recorder.save(session, record_to)
+    return observation
+
+
+def main():
+    """Simulate rounds from the command line and report the speed"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--record", metavar="PATH")
+    parser.add_argument(
+        "--replay", metavar="PATH", help="re-run a replay at full speed"
+    )
+    parser.add_argument(
+        "--entity-store",
+        action="store_true",
+        help="keep missiles, projectiles and power ups in numpy arrays",
+    )
+    args = parser.parse_args()
+    if args.entity_store and args.record:
+        # Replays are always played back through sprites
+        parser.error("--record can't be combined with --entity-store")
+
+    if args.replay:
+        start = time.perf_counter()
+        result = replay.play_replay(replay.load_replay(args.replay))
+        elapsed = time.perf_counter() - start
+        verdict = "matches" if result["matches"] else "DIVERGED"
+        print(
+            f"replay {verdict} after {result['tick']} ticks "
+            f"in {elapsed:.2f}s"
+        )
+        return
+
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        result = simulate_round(
+            args.difficulty,
+            seed=args.seed,
+            record_to=args.record,
+            entity_store=args.entity_store,
+        )
+        elapsed = time.perf_counter() - start
+        outcome = "game over" if result["game_over"] else "round over"
+        print(
+            f"{outcome} after {result['tick']} ticks "
+            f"({result['tick'] / G.TICK_RATE:.1f}s game time) "
+            f"in {elapsed:.2f}s, score {result['score']}, "
+            f"health {result['health']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
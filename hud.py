@@ -1,70 +1,130 @@
 import pygame
 import global_variables as G
 from functions import text_objects
+from text_cache import render_text, join, DigitAtlas
+import asset_cache
 
 
 class Hud(object):
-    def __init__(self, health, score, ammo):
+    def __init__(self, health, score, ammo, renderer):
         self.health = health
         self.score = score
-        self.image = pygame.image.load("assets/gun_icon.png").convert_alpha()
+        self.image = asset_cache.load_image("assets/gun_icon.png")
         self.ammo_text = G.SMALL_TEXT
+        self.digits = DigitAtlas(G.SMALL_TEXT, G.WHITE)
+        self.renderer = renderer
+        # widget name -> (value, rect) as of the last time it was drawn
+        self.drawn = {}
 
-    def draw_health(self, health):
+        # The controls and health icons are baked into the renderer's
+        # background, which is only rebuilt when health changes
+        self.base = renderer.background
+        self.baked_health = health
+        self.health_rect = self.health_area(health)
+        renderer.set_background(self.bake(health))
+
+    def bake(self, health):
+        """Return the background with every static widget drawn on it"""
+
+        layer = self.base.copy()
+        self.draw_controls(layer)
+        self.draw_controls2(layer)
+        self.draw_health(layer, health)
+        return layer
+
+    def update_health(self, health):
+        """Rebake the static layer and repaint the health icons"""
+
+        new_rect = self.health_area(health)
+        repainted = self.health_rect.union(new_rect)
+        self.renderer.set_background(self.bake(health), repainted)
+        self.baked_health = health
+        self.health_rect = new_rect
+        return repainted
+
+    def draw_widget(self, name, value, draw, erased, force):
+        """Redraw a widget if its value changed or a sprite erased it"""
+
+        last = self.drawn.get(name)
+        if (
+            not force
+            and last is not None
+            and last[0] == value
+            and last[1].collidelist(erased) == -1
+        ):
+            return
+        if last is not None:
+            self.renderer.erase(last[1])
+        self.drawn[name] = (value, draw(value))
+
+    def health_icon_rects(self, health):
         for i in range(health):
-            img_rect = self.image.get_rect(
+            yield self.image.get_rect(
                 center=(
                     G.DISPLAY_WIDTH - (30 * (i + 1)),
                     G.DISPLAY_HEIGHT * 0.97,
                 )
             )
-            G.SCREEN.blit(self.image, img_rect)
+
+    def health_area(self, health):
+        rect = pygame.Rect(
+            G.DISPLAY_WIDTH, int(G.DISPLAY_HEIGHT * 0.97), 0, 0
+        )
+        for img_rect in self.health_icon_rects(health):
+            rect.union_ip(img_rect)
+        return rect
+
+    def draw_health(self, surface, health):
+        for img_rect in self.health_icon_rects(health):
+            surface.blit(self.image, img_rect)
 
     def draw_score(self, score):
-        scoreboard_surf, scoreboard_rect = text_objects(
-            "Score: " + str(score),
-            G.SMALL_TEXT,
-            G.WHITE,
-            ((G.DISPLAY_WIDTH * 0.065), (G.DISPLAY_HEIGHT * 0.025)),
+        scoreboard_surf = join(
+            render_text("Score: ", G.SMALL_TEXT, G.WHITE),
+            self.digits.render(score),
+        )
+        scoreboard_rect = scoreboard_surf.get_rect(
+            center=((G.DISPLAY_WIDTH * 0.065), (G.DISPLAY_HEIGHT * 0.025))
         )
-        G.SCREEN.blit(scoreboard_surf, scoreboard_rect)
+        return self.renderer.blit(scoreboard_surf, scoreboard_rect)
 
     def draw_ammo(self, ammo):
         if ammo == 0:
-            ammo_status = "Reloading"
             self.ammo_text = G.SMALL_ITALIC_TEXT
+            ammo_surf = render_text("Ammo: Reloading", self.ammo_text, G.WHITE)
         else:
-            ammo_status = str(ammo)
             self.ammo_text = G.SMALL_TEXT
-        ammo_surf, ammo_rect = text_objects(
-            "Ammo: " + ammo_status,
-            self.ammo_text,
-            G.WHITE,
-            ((G.DISPLAY_WIDTH * 0.87), (G.DISPLAY_HEIGHT * 0.93)),
+            ammo_surf = join(
+                render_text("Ammo: ", self.ammo_text, G.WHITE),
+                self.digits.render(ammo),
+            )
+        ammo_rect = ammo_surf.get_rect(
+            center=((G.DISPLAY_WIDTH * 0.87), (G.DISPLAY_HEIGHT * 0.93))
         )
-        G.SCREEN.blit(ammo_surf, ammo_rect)
+        return self.renderer.blit(ammo_surf, ammo_rect)
 
-    def draw_controls(self):
+    def draw_controls(self, surface):
         control_surf, control_rect = text_objects(
             "Press 'SPACE' to Fire!",
             G.TINY_TEXT,
             G.WHITE,
             ((G.DISPLAY_WIDTH * 0.11), (G.DISPLAY_HEIGHT * 0.97)),
         )
-        G.SCREEN.blit(control_surf, control_rect)
+        surface.blit(control_surf, control_rect)
 
-    def draw_controls2(self):
+    def draw_controls2(self, surface):
         control_surf, control_rect = text_objects(
             "Press 'ESC' to Pause!",
             G.TINY_TEXT,
             G.WHITE,
             ((G.DISPLAY_WIDTH * 0.109), (G.DISPLAY_HEIGHT * 0.94)),
         )
-        G.SCREEN.blit(control_surf, control_rect)
-
-    def draw_hud(self, score, ammo, health):
-        self.draw_score(score)
-        self.draw_ammo(ammo)
-        self.draw_controls()
-        self.draw_controls2()
-        self.draw_health(health)
+        surface.blit(control_surf, control_rect)
+
+    def draw_hud(self, score, ammo, health, erased=(), force=False):
+        """Draw the widgets that changed or were erased by sprites"""
+        health = max(health, 0)
+        if health != self.baked_health:
+            erased = list(erased) + [self.update_health(health)]
+        self.draw_widget("score", score, self.draw_score, erased, force)
+        self.draw_widget("ammo", ammo, self.draw_ammo, erased, force)
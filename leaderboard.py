@@ -0,0 +1,113 @@
+"""Top scores kept in a small sidecar file next to the score store
+
+The best LEADERBOARD_SIZE scores are held in a bounded min-heap, so
+recording a score costs O(log N) and showing the high scores page never
+reads the full history. Deeper ranks are paged straight from the score
+store.
+"""
+import os
+import json
+import heapq
+from score_store import ScoreStore
+
+LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_SIZE = 10
+
+
+class Leaderboard(object):
+    """Bounded heap of the best scores, persisted as a sidecar"""
+
+    def __init__(self, path=LEADERBOARD_FILE, size=LEADERBOARD_SIZE):
+        self.path = path
+        self.size = size
+        # (score, -order, player): the root is the entry to evict next,
+        # the lowest score and among equal scores the most recent one
+        self.heap = []
+        self.order = 0
+        if os.path.isfile(path):
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError, TypeError):
+                # Unreadable or corrupt, the store still has every score
+                self.rebuild()
+        else:
+            self.rebuild()
+
+    def load(self):
+        """Read the sidecar"""
+
+        with open(self.path) as leaderboard_file:
+            data = json.load(leaderboard_file)
+        self.order = data["order"]
+        self.heap = [
+            (entry["score"], -entry["order"], entry["player"])
+            for entry in data["entries"]
+        ]
+        heapq.heapify(self.heap)
+
+    def rebuild(self):
+        """Seed the heap from the score store, then write the sidecar"""
+
+        store = ScoreStore()
+        records = store.top(self.size)
+        store.close()
+        self.heap = [
+            (record["score"], -order, record["player"])
+            for order, record in enumerate(records)
+        ]
+        heapq.heapify(self.heap)
+        self.order = len(records)
+        self.save()
+
+    def save(self):
+        """Atomically replace the sidecar"""
+
+        data = {
+            "order": self.order,
+            "entries": [
+                {"player": player, "score": score, "order": -order}
+                for score, order, player in self.heap
+            ],
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as leaderboard_file:
+            json.dump(data, leaderboard_file)
+            leaderboard_file.flush()
+            os.fsync(leaderboard_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def record(self, player, score, save=True):
+        """Offer a score, returning True if it made the leaderboard
+
+        Pass save=False when recording several scores and call save()
+        once at the end.
+        """
+
+        entry = (score, -self.order, player)
+        self.order += 1
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+        else:
+            return False
+        if save:
+            self.save()
+        return True
+
+    def top(self):
+        """Score entries, best first"""
+        return [
+            {"player": player, "score": score}
+            for score, order, player in sorted(self.heap, reverse=True)
+        ]
+
+    def page(self, number):
+        """Score entries on page number, the first page being the top"""
+
+        if number == 0:
+            return self.top()
+        store = ScoreStore()
+        records = store.top(self.size, number * self.size)
+        store.close()
+        return records
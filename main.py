@@ -1,5 +1,17 @@
 """Launches the game menu"""
+import argparse
+import global_variables as G
 import game_menu as menu
+import scenes
 
 if __name__ == "__main__":
-    menu.game_menu()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print where the startup time went after the first frame",
+    )
+    args = parser.parse_args()
+    if args.startup_report:
+        G.SHOW_STARTUP_REPORT = True
+    scenes.run(menu.MenuScene())
@@ -1,23 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 import global_variables as G
 import game_loop as game
+import asset_cache
+import pools
 from functions import text_objects
+from scenes import Scene
+from session import GameSession
 
+# Threads that decode images while the round banner is up
+DECODE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="decode")
 
-def new_round():
-    pygame.mixer.music.stop()
 
-    round_surf, round_rect = text_objects(
-        f"ROUND {G.DIFFICULTY}",
-        G.GIANT_TEXT,
-        G.WHITE,
-        (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.5),
-    )
+class NewRoundScene(Scene):
+    """Shows the round number while the round loads behind it
 
-    G.SCREEN.fill(G.WHITE)
-    G.SCREEN.blit(G.BACKGROUND_2.image, G.BACKGROUND_2.rect)
-    G.SCREEN.blit(round_surf, round_rect)
-    pygame.display.update()
+    Loading runs one step per frame so events are still handled: images
+    are decoded on DECODE_POOL while the music and sound effects load,
+    then converted, the session is built with its wave and the round's
+    garbage collector setting is applied. The round starts once the
+    banner has been up for banner_duration and loading is done.
+    """
 
-    pygame.time.delay(2500)
-    game.game_loop()
+    banner_duration = 2500
+
+    def enter(self):
+        pygame.mixer.music.stop()
+
+        round_surf, round_rect = text_objects(
+            f"ROUND {G.DIFFICULTY}",
+            G.GIANT_TEXT,
+            G.WHITE,
+            (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.5),
+        )
+
+        G.SCREEN.fill(G.WHITE)
+        G.SCREEN.blit(G.BACKGROUND_2.image, G.BACKGROUND_2.rect)
+        G.SCREEN.blit(round_surf, round_rect)
+        pygame.display.update()
+
+        self.start_time = pygame.time.get_ticks()
+        self.session = None
+        self.loading = self.load_round()
+
+    def load_round(self):
+        """Warm up the next round, yielding between steps"""
+
+        decoding = asset_cache.prefetch(DECODE_POOL)
+        pygame.mixer.music.load(game.GAME_MUSIC)
+        yield
+        # Sounds load on first use, which would be mid-round
+        for name in ("SHOOT_FX", "EXPLOSION_FX", "POWER_UP_FX_LIST"):
+            getattr(G, name)
+            yield
+        while not all(future.done() for future in decoding):
+            yield
+        asset_cache.preload()
+        yield
+        self.session = GameSession()
+        yield
+        # Collect before the first frame rather than on it
+        pools.begin_round()
+
+    def update(self, frame_time):
+        if self.loading is not None:
+            try:
+                next(self.loading)
+            except StopIteration:
+                self.loading = None
+        elif pygame.time.get_ticks() - self.start_time >= self.banner_duration:
+            self.manager.replace(game.GameScene(self.session))
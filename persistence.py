@@ -0,0 +1,188 @@
+"""Disk writes on a background thread
+
+Scores, replays and frame timings are handed to one worker thread so the
+render thread never waits on the disk. Scores that arrive together are
+written in one transaction. When a score is on disk the worker posts a
+SCORE_SAVED event carrying the player and score, which screens can handle
+like any other event. If a score can't be written it posts
+SCORE_SAVE_FAILED instead.
+"""
+import os
+import queue
+import threading
+import traceback
+import pygame
+from score_store import ScoreStore
+from leaderboard import Leaderboard
+
+SCORE_SAVED = pygame.event.custom_type()
+SCORE_SAVE_FAILED = pygame.event.custom_type()
+
+# Job kinds
+SCORE = "score"
+CALL = "call"
+STOP = "stop"
+
+
+class PersistenceWorker(object):
+    """Owns the score store and runs queued disk writes in order"""
+
+    def __init__(self, batch_size=32):
+        self.batch_size = batch_size
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread if it isn't running"""
+
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="persistence", daemon=True
+                )
+                self.thread.start()
+
+    def save_score(self, player, score):
+        """Queue a score to be recorded"""
+        self.start()
+        self.jobs.put((SCORE, {"player": player, "score": score}))
+
+    def call(self, function, *args):
+        """Queue function(*args) to run on the worker thread"""
+        self.start()
+        self.jobs.put((CALL, (function, args)))
+
+    def flush(self):
+        """Block until every queued job is done"""
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.join()
+
+    def stop(self):
+        """Finish the queued jobs and end the worker thread"""
+
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.put((STOP, None))
+            self.thread.join()
+        self.thread = None
+
+    def run(self):
+        files = None
+        running = True
+        while running:
+            batch = [self.jobs.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            if files is None:
+                files = self.open_files()
+            scores = []
+            for kind, payload in batch:
+                if kind == SCORE:
+                    scores.append(payload)
+                    continue
+                # Keep jobs in order: scores queued earlier go first
+                self.save_scores(files, scores)
+                scores = []
+                if kind == CALL:
+                    function, args = payload
+                    attempt(function, *args)
+                elif kind == STOP:
+                    running = False
+            self.save_scores(files, scores)
+
+            for _ in batch:
+                self.jobs.task_done()
+        if files is not None:
+            files[1].close()
+
+    def open_files(self):
+        """Return the leaderboard and score store, or None if they fail
+
+        SQLite connections belong to the thread that opened them, so this
+        runs on the worker. The leaderboard is loaded before any score
+        lands in the store so a rebuild can't count it twice. On failure
+        the next batch tries again.
+        """
+        try:
+            leaderboard = Leaderboard()
+            return leaderboard, ScoreStore()
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def save_scores(self, files, scores):
+        """Write a batch of scores, announcing whether it worked"""
+
+        if not scores:
+            return
+        if files is not None and attempt(self.write_scores, files, scores):
+            announce(SCORE_SAVED, scores)
+        else:
+            announce(SCORE_SAVE_FAILED, scores)
+
+    def write_scores(self, files, scores):
+        """Record a batch of scores in the store and the leaderboard"""
+
+        leaderboard, store = files
+        store.add_many(scores)
+        for entry in scores:
+            leaderboard.record(entry["player"], entry["score"], save=False)
+        leaderboard.save()
+
+
+def announce(event_type, scores):
+    """Post one event_type event per score entry"""
+
+    for entry in scores:
+        try:
+            pygame.event.post(pygame.event.Event(event_type, entry))
+        except pygame.error:
+            # The display is already gone, nobody is listening
+            pass
+
+
+def attempt(function, *args):
+    """Run one job, reporting rather than raising its errors
+
+    A failed write mustn't take the worker, or the jobs after it, down
+    with it. Returns True if the job succeeded.
+    """
+    try:
+        function(*args)
+    except Exception:
+        traceback.print_exc()
+        return False
+    return True
+
+
+def write_file(path, data):
+    """Atomically replace path with data"""
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as out_file:
+        out_file.write(data)
+        out_file.flush()
+        os.fsync(out_file.fileno())
+    os.replace(temp_path, path)
+
+
+WORKER = PersistenceWorker()
+
+
+def save_score(player, score):
+    """Queue a score on the shared worker"""
+    WORKER.save_score(player, score)
+
+
+def call(function, *args):
+    """Run function(*args) on the shared worker"""
+    WORKER.call(function, *args)
+
+
+def flush():
+    """Wait for the shared worker to finish its queue"""
+    WORKER.flush()
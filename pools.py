@@ -0,0 +1,124 @@
+"""Free lists for the sprites a round creates and kills by the hundred
+
+Projectiles, missiles and explosions are taken from a pool with
+acquire() and go back on their own when killed, so a round reuses the
+same few objects instead of feeding the garbage collector. Each round
+warms the pools up front and can keep the cyclic garbage collector out
+of the way while it runs.
+"""
+import gc
+import sprites
+
+# Sprites of each kind created before a round starts
+WARM_UP = {"projectiles": 30, "missiles": 12, "explosions": 12}
+
+# What the cyclic garbage collector does during a round: "on" leaves it
+# alone, "freeze" moves everything that exists when the round starts out
+# of its reach so collections only scan new objects, and "off" disables
+# it until the round ends
+GC_DURING_ROUND = "freeze"
+
+
+class SpritePool(object):
+    """Free list of one PooledSprite class
+
+    warm_args are the constructor arguments used to create spare sprites
+    ahead of time; acquire() resets them before they are used.
+    """
+
+    def __init__(self, sprite_class, warm_args):
+        self.sprite_class = sprite_class
+        self.warm_args = warm_args
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.peak_in_use = 0
+
+    def acquire(self, *args):
+        """Return a sprite set up with args, reusing a free one if any"""
+
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(*args)
+            self.created += 1
+        sprite.pool = self
+        in_use = self.created - len(self.free)
+        if in_use > self.peak_in_use:
+            self.peak_in_use = in_use
+        return sprite
+
+    def release(self, sprite):
+        """Take back a sprite, called when it is killed"""
+        self.free.append(sprite)
+
+    def warm_up(self, count):
+        """Make sure at least count sprites are free"""
+
+        while len(self.free) < count:
+            self.free.append(self.sprite_class(*self.warm_args))
+            self.created += 1
+
+    def stats(self):
+        """Counts for tuning WARM_UP"""
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "free": len(self.free),
+            "in_use": self.created - len(self.free),
+            "peak_in_use": self.peak_in_use,
+        }
+
+
+PROJECTILES = SpritePool(sprites.Projectile, ((0, 0), 0))
+MISSILES = SpritePool(sprites.Missile, ((0, 0), 1))
+EXPLOSIONS = SpritePool(sprites.Missile_Explosion, ((0, 0), 1))
+
+POOLS = {
+    "projectiles": PROJECTILES,
+    "missiles": MISSILES,
+    "explosions": EXPLOSIONS,
+}
+
+_ROUND = {"playing": False}
+
+
+def warm_up(sizes=None):
+    """Fill each pool up to its WARM_UP size, or to sizes[name]"""
+
+    sizes = dict(WARM_UP, **(sizes or {}))
+    for name, pool in POOLS.items():
+        pool.warm_up(sizes[name])
+
+
+def begin_round():
+    """Apply GC_DURING_ROUND as a round starts playing"""
+
+    if _ROUND["playing"]:
+        return
+    _ROUND["playing"] = True
+    if GC_DURING_ROUND == "freeze":
+        gc.collect()
+        gc.freeze()
+    elif GC_DURING_ROUND == "off":
+        gc.disable()
+
+
+def end_round():
+    """Undo begin_round and collect what the round left behind"""
+
+    if not _ROUND["playing"]:
+        return
+    _ROUND["playing"] = False
+    if GC_DURING_ROUND == "freeze":
+        gc.unfreeze()
+    elif GC_DURING_ROUND == "off":
+        gc.enable()
+    gc.collect()
+
+
+def stats():
+    """Stats of every pool by name"""
+    return {name: pool.stats() for name, pool in POOLS.items()}
@@ -0,0 +1,150 @@
+"""Always-on per-phase frame timing"""
+import csv
+from array import array
+from time import perf_counter
+import pygame
+import global_variables as G
+
+# Phases, in the order a frame runs them
+EVENTS = 0
+TIMERS = 1
+SPAWN = 2
+UPDATE = 3
+COLLISION = 4
+HUD = 5
+DRAW = 6
+FLIP = 7
+PHASE_NAMES = (
+    "events",
+    "timers",
+    "spawn",
+    "update",
+    "collision",
+    "hud",
+    "draw",
+    "flip",
+)
+PHASE_COLORS = (
+    (200, 200, 200),
+    (120, 120, 255),
+    (255, 160, 0),
+    (0, 200, 255),
+    (255, 60, 60),
+    (255, 255, 0),
+    (0, 255, 0),
+    (255, 0, 255),
+)
+
+FRAME_TIMES_FILE = "frame_times.csv"
+
+# Where the overlay goes, clear of the HUD
+OVERLAY_RECT = pygame.Rect(510, 40, 280, 150)
+
+
+class FrameProfiler(object):
+    """Accumulates time per phase into a fixed-size ring buffer
+
+    mark(phase) charges the time since the previous mark to phase, so a
+    frame costs one perf_counter call per phase boundary. Phases that run
+    once per simulation tick simply add up over the frame.
+    """
+
+    def __init__(self, size=600):
+        self.size = size
+        self.samples = [array("d", bytes(8 * size)) for _ in PHASE_NAMES]
+        self.current = [0.0] * len(PHASE_NAMES)
+        self.index = 0
+        self.count = 0
+        self.last = perf_counter()
+
+    def begin(self):
+        """Start timing a frame"""
+        self.current = [0.0] * len(PHASE_NAMES)
+        self.last = perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the last mark to phase"""
+        now = perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end(self):
+        """Store the frame in the ring buffer"""
+
+        index = self.index
+        for phase, seconds in enumerate(self.current):
+            self.samples[phase][index] = seconds
+        self.index = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def frames(self):
+        """Yield per-phase seconds of the stored frames, oldest first"""
+
+        start = (self.index - self.count) % self.size
+        for offset in range(self.count):
+            index = (start + offset) % self.size
+            yield [samples[index] for samples in self.samples]
+
+    def export_csv(self, path=FRAME_TIMES_FILE):
+        """Write the stored frames to a CSV file, in milliseconds"""
+
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(("frame",) + PHASE_NAMES + ("total",))
+            for number, phases in enumerate(self.frames()):
+                writer.writerow(
+                    [number]
+                    + [f"{seconds * 1000:.3f}" for seconds in phases]
+                    + [f"{sum(phases) * 1000:.3f}"]
+                )
+
+    def render_overlay(self, counts, notes=()):
+        """Return a panel with a frame time graph, entity counts and notes"""
+
+        panel_rect = OVERLAY_RECT
+        panel = pygame.Surface(panel_rect.size)
+        panel.fill(G.BLACK)
+        graph_height = 60
+        budget = 1 / G.TICK_RATE
+        scale = graph_height / (2 * budget)
+
+        # One stacked column per frame, newest on the right
+        frames = list(self.frames())[-panel_rect.width :]
+        x = panel_rect.width - len(frames)
+        for phases in frames:
+            y = graph_height
+            for phase, seconds in enumerate(phases):
+                height = min(int(seconds * scale), y)
+                if height:
+                    pygame.draw.line(
+                        panel,
+                        PHASE_COLORS[phase],
+                        (x, y),
+                        (x, y - height),
+                    )
+                    y -= height
+            x += 1
+        budget_y = graph_height - int(budget * scale)
+        pygame.draw.line(
+            panel, G.WHITE, (0, budget_y), (panel_rect.width, budget_y)
+        )
+
+        lines = []
+        if frames:
+            lines.append(f"frame {sum(frames[-1]) * 1000:.2f} ms")
+        lines.append(
+            "  ".join(f"{name} {count}" for name, count in counts.items())
+        )
+        lines.extend(notes)
+        y = graph_height + 4
+        for line in lines:
+            text = G.TINY_TEXT.render(line, True, G.WHITE)
+            panel.blit(text, (4, y))
+            y += text.get_height()
+        for phase, name in enumerate(PHASE_NAMES):
+            text = G.TINY_TEXT.render(name, True, PHASE_COLORS[phase])
+            panel.blit(
+                text, (4 + (phase % 4) * 56, y + (phase // 4) * 16)
+            )
+
+        return panel
@@ -0,0 +1,93 @@
+"""Dirty rectangle rendering"""
+import pygame
+import global_variables as G
+
+
+def compose_background(background, fill=G.WHITE):
+    """Flatten a background sprite onto an opaque, display-format surface"""
+
+    surface = pygame.Surface((G.DISPLAY_WIDTH, G.DISPLAY_HEIGHT)).convert()
+    surface.fill(fill)
+    surface.blit(background.image, background.rect)
+    return surface
+
+
+class DirtyRenderer(object):
+    """Repaints and pushes only the parts of the screen that changed"""
+
+    def __init__(self, background, screen=None):
+        self.screen = screen if screen is not None else G.SCREEN
+        self.background = background
+        self.dirty_rects = []
+        self.full_redraw = True
+
+    def set_background(self, background, changed=None):
+        """Swap the background
+
+        With a changed rect only that area is repainted, otherwise the
+        whole screen is repainted next frame.
+        """
+
+        self.background = background
+        if changed is None:
+            self.invalidate()
+        else:
+            self.erase(changed)
+
+    def invalidate(self):
+        """Force a full repaint, e.g. after another screen drew over ours"""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """Start a frame, repainting the whole background if needed
+
+        Returns True when the whole screen was repainted, in which case
+        every widget has to be drawn again.
+        """
+
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            return True
+        return False
+
+    def clear(self, group):
+        """Erase the sprites of a RenderUpdates group from last frame
+
+        Returns the erased rects so widgets underneath can redraw.
+        """
+
+        erased = [rect for rect in group.spritedict.values() if rect]
+        erased.extend(group.lostsprites)
+        group.clear(self.screen, self.background)
+        return erased
+
+    def erase(self, rect):
+        """Restore the background under rect"""
+        self.screen.blit(self.background, rect, rect)
+        self.dirty_rects.append(rect)
+
+    def blit(self, surface, rect):
+        """Draw surface, mark its rect dirty and return it"""
+        drawn = self.screen.blit(surface, rect)
+        self.dirty_rects.append(drawn)
+        return drawn
+
+    def blits(self, blit_sequence):
+        """Draw (surface, position) pairs, mark and return their rects"""
+        drawn = self.screen.blits(blit_sequence)
+        self.dirty_rects.extend(drawn)
+        return drawn
+
+    def draw(self, group):
+        """Draw a RenderUpdates group and mark every rect it touched"""
+        self.dirty_rects.extend(group.draw(self.screen))
+
+    def flush(self):
+        """Push the dirty rects (or the whole screen) to the display"""
+
+        if self.full_redraw:
+            pygame.display.update()
+            self.full_redraw = False
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.dirty_rects = []
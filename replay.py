@@ -0,0 +1,167 @@
+"""Deterministic record and replay of rounds
+
+A replay is the session seed, the global state a round starts from and
+every input keyed by the tick that consumed it. Feeding the same inputs to
+a session built from the same seed reproduces the round exactly.
+
+File layout, little endian:
+    header  magic, version, tick rate, seed, difficulty, score,
+            permanent health and ammo power ups
+    inputs  (tick, input code) per input
+    end     (final tick, END), then the final score and health
+"""
+import struct
+import argparse
+import pygame
+import global_variables as G
+import audio
+from session import GameSession, FIRE
+
+MAGIC = b"RRPL"
+VERSION = 3
+REPLAY_FILE = "last_round.replay"
+
+HEADER = struct.Struct("<4sBHQHqHH")
+RECORD = struct.Struct("<IB")
+RESULT = struct.Struct("<qh")
+
+INPUT_CODES = {FIRE: 1}
+CODE_INPUTS = {code: action for action, code in INPUT_CODES.items()}
+END = 0xFF
+
+
+class ReplayRecorder(object):
+    """Logs the inputs a session consumes, tick by tick"""
+
+    def __init__(self, session):
+        self.header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            G.TICK_RATE,
+            session.seed,
+            G.DIFFICULTY,
+            G.SCORE,
+            G.PERMANENT_POWER_UPS["higher_max_health"],
+            G.PERMANENT_POWER_UPS["higher_max_ammo"],
+        )
+        self.records = bytearray()
+
+    def record(self, tick, inputs):
+        """Log the inputs consumed by tick"""
+        for action in inputs:
+            self.records += RECORD.pack(tick, INPUT_CODES[action])
+
+    def dump(self, session):
+        """Return the replay bytes, ending at the session's current tick"""
+        return b"".join(
+            (
+                self.header,
+                self.records,
+                RECORD.pack(session.tick, END),
+                RESULT.pack(G.SCORE, session.player.health),
+            )
+        )
+
+    def save(self, session, path=REPLAY_FILE):
+        """Write the replay, ending at the session's current tick"""
+
+        with open(path, "wb") as replay_file:
+            replay_file.write(self.dump(session))
+
+
+def load_replay(path=REPLAY_FILE):
+    """Read a replay file into a dict"""
+
+    with open(path, "rb") as replay_file:
+        data = replay_file.read()
+
+    (
+        magic,
+        version,
+        tick_rate,
+        seed,
+        difficulty,
+        score,
+        higher_max_health,
+        higher_max_ammo,
+    ) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay")
+
+    inputs = {}
+    offset = HEADER.size
+    while True:
+        tick, code = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if code == END:
+            break
+        inputs.setdefault(tick, []).append(CODE_INPUTS[code])
+    final_score, final_health = RESULT.unpack_from(data, offset)
+
+    return {
+        "tick_rate": tick_rate,
+        "seed": seed,
+        "difficulty": difficulty,
+        "score": score,
+        "permanent_power_ups": {
+            "higher_max_health": higher_max_health,
+            "higher_max_ammo": higher_max_ammo,
+        },
+        "inputs": inputs,
+        "end_tick": tick,
+        "final_score": final_score,
+        "final_health": final_health,
+    }
+
+
+def play_replay(replay, render=False, realtime=False):
+    """Re-run a loaded replay and return the final observation
+
+    The observation gets a "matches" key saying whether the replay ended
+    with the recorded score and health.
+    """
+
+    if replay["tick_rate"] != G.TICK_RATE:
+        raise ValueError(
+            f"replay was recorded at {replay['tick_rate']} ticks a second, "
+            f"the game runs at {G.TICK_RATE}"
+        )
+
+    G.DIFFICULTY = replay["difficulty"]
+    G.SCORE = replay["score"]
+    G.PERMANENT_POWER_UPS.update(replay["permanent_power_ups"])
+
+    session = GameSession(
+        render=render, audio=render, seed=replay["seed"]
+    )
+    inputs = replay["inputs"]
+    while session.tick < replay["end_tick"]:
+        session.step(inputs.get(session.tick + 1, ()))
+        if render:
+            pygame.event.pump()
+            session.draw()
+            session.flip()
+            audio.flush()
+        if realtime:
+            G.CLOCK.tick(G.TICK_RATE)
+
+    observation = session.observe()
+    observation["matches"] = (
+        G.SCORE == replay["final_score"]
+        and session.player.health == replay["final_health"]
+    )
+    return observation
+
+
+def main():
+    """Watch a replay in a window at normal speed"""
+
+    parser = argparse.ArgumentParser(description="Watch a recorded round")
+    parser.add_argument("path", nargs="?", default=REPLAY_FILE)
+    args = parser.parse_args()
+    result = play_replay(load_replay(args.path), render=True, realtime=True)
+    print("replay matches" if result["matches"] else "replay DIVERGED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Scene stack that drives every screen from one flat loop"""
+import pygame
+import global_variables as G
+import audio
+from functions import exit_game
+
+# Ends an idle wait. event.wait() only takes a timeout from pygame
+# 2.0.0.dev13, so the wait is cut short with a timer instead.
+WAKE = pygame.event.custom_type()
+
+
+class Scene(object):
+    """One screen of the game
+
+    The manager calls enter() whenever the scene becomes the top of the
+    stack, then begin_frame(), handle_event(), update() and draw() once
+    per frame, and exit() once the scene is dropped from the stack.
+    Screens that only change on input say so with idle(), and the manager
+    then sleeps between events instead of polling.
+    """
+
+    # Frame cap while this scene is on top
+    max_fps = 15
+
+    # While idle() is true the manager sleeps until an event arrives or
+    # this many milliseconds pass, instead of running at max_fps
+    idle_timeout = 1000
+
+    def __init__(self):
+        self.manager = None
+
+    def idle(self):
+        """True when nothing changes on screen until an event arrives"""
+        return False
+
+    def enter(self):
+        """Called each time the scene becomes the top of the stack"""
+
+    def exit(self):
+        """Called once when the scene is dropped from the stack"""
+
+    def begin_frame(self):
+        """Called at the start of every frame, before any events"""
+
+    def handle_event(self, event):
+        """React to one pygame event"""
+
+    def update(self, frame_time):
+        """Advance by frame_time seconds"""
+
+    def draw(self):
+        """Draw the scene and update the display"""
+
+
+class SceneManager(object):
+    """Holds the scene stack and runs the main loop"""
+
+    def __init__(self):
+        self.stack = []
+        self.changed = False
+
+    @property
+    def top(self):
+        """The active scene"""
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        """Put scene on top, keeping the current one underneath"""
+        scene.manager = self
+        self.stack.append(scene)
+        self.changed = True
+
+    def pop(self):
+        """Drop the top scene and return to the one underneath"""
+        self.stack.pop().exit()
+        self.changed = True
+
+    def replace(self, scene):
+        """Swap the top scene for scene"""
+        self.stack.pop().exit()
+        self.push(scene)
+
+    def reset(self, scene):
+        """Drop every scene and start over from scene"""
+        while self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    def run(self, scene):
+        """Run scenes until the stack is empty"""
+
+        G.init_display()
+        self.push(scene)
+        frame_time = 0
+        while self.stack:
+            scene = self.top
+            if self.changed:
+                self.changed = False
+                scene.enter()
+                # Time spent in other scenes doesn't count
+                G.CLOCK.tick()
+                frame_time = 0
+                continue
+
+            scene.begin_frame()
+            idle = scene.idle()
+            if idle:
+                events = wait_for_events(scene.idle_timeout)
+            else:
+                events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    exit_game()
+                scene.handle_event(event)
+                if self.changed:
+                    break
+
+            if not self.changed:
+                scene.update(frame_time)
+            if not self.changed:
+                scene.draw()
+            audio.flush()
+            G.first_frame()
+
+            if idle:
+                # The wait already slept, don't add a frame cap delay
+                frame_time = G.CLOCK.tick() / 1000
+            else:
+                frame_time = G.CLOCK.tick(scene.max_fps) / 1000
+
+
+def wait_for_events(timeout):
+    """Sleep until an event arrives or timeout ms pass, return the events"""
+
+    # A zero interval would cancel the timer and never wake up
+    pygame.time.set_timer(WAKE, max(timeout, 1))
+    first = pygame.event.wait()
+    pygame.time.set_timer(WAKE, 0)
+    return [
+        event
+        for event in [first] + pygame.event.get()
+        if event.type != WAKE
+    ]
+
+
+def run(scene):
+    """Start the game from scene"""
+    SceneManager().run(scene)
@@ -0,0 +1,123 @@
+"""Persistent high score storage
+
+Scores live in an SQLite database with an index on score, so recording a
+score is one small transaction and reading the top N never touches the
+rest of the history. Scores from the old scores.json file are imported
+the first time the store is opened.
+"""
+import os
+import json
+import time
+import sqlite3
+
+SCORES_DB = "scores.db"
+LEGACY_SCORES_FILE = "scores.json"
+
+# Keep at most this many scores (the best ones), None keeps everything
+SCORE_RETENTION = None
+
+
+class ScoreStore(object):
+    """SQLite backed score history"""
+
+    def __init__(self, path=SCORES_DB, retention=SCORE_RETENTION):
+        self.retention = retention
+        self.connection = sqlite3.connect(path)
+        # Commits are durable and a crash mid-write can't corrupt the file
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                " id INTEGER PRIMARY KEY,"
+                " player TEXT NOT NULL,"
+                " score INTEGER NOT NULL,"
+                " recorded REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS scores_by_score"
+                " ON scores (score DESC, id)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                " key TEXT PRIMARY KEY, value TEXT)"
+            )
+        self.migrate()
+
+    def migrate(self, legacy_path=LEGACY_SCORES_FILE):
+        """Import scores.json once, then move it out of the way"""
+
+        if not os.path.isfile(legacy_path):
+            return
+        migrated = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'migrated'"
+        ).fetchone()
+        if migrated is None:
+            with open(legacy_path) as scores_file:
+                score_data = json.load(scores_file)
+            now = time.time()
+            # The rows and the marker commit together, so a crash can
+            # never import the same file twice
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO scores (player, score, recorded)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        (record["player"], record["score"], now)
+                        for record in score_data["scores"]
+                    ),
+                )
+                self.connection.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated', ?)",
+                    (legacy_path,),
+                )
+            self.prune()
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+    def add(self, player, score):
+        """Record one score"""
+        self.add_many([{"player": player, "score": score}])
+
+    def add_many(self, entries):
+        """Record several score entries in one transaction"""
+
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (player, score, recorded)"
+                " VALUES (?, ?, ?)",
+                ((entry["player"], entry["score"], now) for entry in entries),
+            )
+        self.prune()
+
+    def prune(self):
+        """Apply the retention policy"""
+
+        if self.retention is None:
+            return
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM scores WHERE id NOT IN"
+                " (SELECT id FROM scores ORDER BY score DESC, id LIMIT ?)",
+                (self.retention,),
+            )
+
+    def top(self, count=10, offset=0):
+        """Return score entries ranked offset+1 to offset+count"""
+
+        rows = self.connection.execute(
+            "SELECT player, score FROM scores"
+            " ORDER BY score DESC, id LIMIT ? OFFSET ?",
+            (count, offset),
+        )
+        return [{"player": player, "score": score} for player, score in rows]
+
+    def count(self):
+        """Number of stored scores"""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM scores"
+        ).fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        self.connection.close()
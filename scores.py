@@ -1,66 +1,93 @@
 import pygame
-import json
 import global_variables as G
-import os
-import game_menu
-from functions import text_objects, exit_game
+from leaderboard import Leaderboard
+from functions import text_objects
+from scenes import Scene
 
 
-def scores_page():
-    pygame.mixer.music.stop()
+class ScoresScene(Scene):
+    """The high scores page"""
 
-    page_title_surf, page_title_rect = text_objects(
-        "High Scores",
-        G.BIG_TEXT,
-        G.WHITE,
-        (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.15),
-    )
+    def enter(self):
+        pygame.mixer.music.stop()
 
-    instructions_surf, instructions_rect = text_objects(
-        "Press space to return to menu",
-        G.MEDIUM_TEXT,
-        G.WHITE,
-        (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.9),
-    )
+        self.leaderboard = Leaderboard()
+        self.page = 0
+        self.records = self.leaderboard.page(self.page)
+        self.draw_page()
 
-    G.SCREEN.fill(G.WHITE)
-    G.SCREEN.blit(G.BACKGROUND_2.image, G.BACKGROUND_2.rect)
-    G.SCREEN.blit(page_title_surf, page_title_rect)
-    G.SCREEN.blit(instructions_surf, instructions_rect)
+    def draw_page(self):
+        """Draw the current page of scores"""
 
-    if not os.path.isfile("scores.json"):
-        no_scores_surf, no_scores_rect = text_objects(
-            "No Scores Found",
+        page_title_surf, page_title_rect = text_objects(
+            "High Scores",
             G.BIG_TEXT,
-            G.RED,
-            (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.5),
+            G.WHITE,
+            (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.15),
         )
-        G.SCREEN.blit(no_scores_surf, no_scores_rect)
-    else:
-        with open('scores.json') as scores_file:
-            score_data = json.load(scores_file)
-        sorted_records = sorted(
-            score_data["scores"], key=lambda k: k["score"], reverse=True
+
+        instructions_surf, instructions_rect = text_objects(
+            "Press space to return to menu",
+            G.MEDIUM_TEXT,
+            G.WHITE,
+            (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.9),
         )
-        y_pos = 0.28
-        for i, record in enumerate(sorted_records[0:10]):
-            record_surf, record_rect = text_objects(
-                f"{i+1})  {record['player']}  -  {record['score']}",
+
+        G.SCREEN.fill(G.WHITE)
+        G.SCREEN.blit(G.BACKGROUND_2.image, G.BACKGROUND_2.rect)
+        G.SCREEN.blit(page_title_surf, page_title_rect)
+        G.SCREEN.blit(instructions_surf, instructions_rect)
+
+        if not self.records:
+            no_scores_surf, no_scores_rect = text_objects(
+                "No Scores Found",
+                G.BIG_TEXT,
+                G.RED,
+                (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.5),
+            )
+            G.SCREEN.blit(no_scores_surf, no_scores_rect)
+        else:
+            first_rank = self.page * self.leaderboard.size + 1
+            y_pos = 0.28
+            for i, record in enumerate(self.records, first_rank):
+                record_surf, record_rect = text_objects(
+                    f"{i})  {record['player']}  -  {record['score']}",
+                    G.SMALL_TEXT,
+                    G.GOLD,
+                    (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * y_pos),
+                )
+                G.SCREEN.blit(record_surf, record_rect)
+                y_pos += 0.06
+
+            page_surf, page_rect = text_objects(
+                f"Page {self.page + 1}  (left/right to turn)",
                 G.SMALL_TEXT,
-                G.GOLD,
-                (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * y_pos),
+                G.WHITE,
+                (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.84),
             )
-            G.SCREEN.blit(record_surf, record_rect)
-            y_pos += 0.06
+            G.SCREEN.blit(page_surf, page_rect)
 
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                exit_game()
+        pygame.display.update()
 
-            if event.type == pygame.KEYUP:
-                if event.key == pygame.K_SPACE:
-                    game_menu.game_menu()
+    def turn_page(self, page):
+        """Show page if it has any scores on it"""
 
-        pygame.display.update()
-        G.CLOCK.tick(15)
+        if page < 0:
+            return
+        records = self.leaderboard.page(page)
+        if records:
+            self.page = page
+            self.records = records
+            self.draw_page()
+
+    def idle(self):
+        return True
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYUP:
+            if event.key == pygame.K_SPACE:
+                self.manager.pop()
+            elif event.key == pygame.K_RIGHT:
+                self.turn_page(self.page + 1)
+            elif event.key == pygame.K_LEFT:
+                self.turn_page(self.page - 1)
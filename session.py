@@ -0,0 +1,516 @@
+"""Round logic that can be stepped without a window"""
+
+import random
+import pygame
+import global_variables as G
+import sprites
+import asset_cache
+import audio
+import pools
+import waves
+from hud import Hud
+from renderer import DirtyRenderer, compose_background
+from collision import SpatialHash
+from animation import Animator
+from spawning import SpawnScheduler, MISSILE, POWER_UP
+import entity_store
+from entity_store import EntityStore, MISSILE_HIT, MISSILE_LANDED, POWER_UP_HIT
+import profiler as prof
+
+# Inputs accepted by GameSession.step
+FIRE = "fire"
+
+
+class Player(object):
+    """Class for holding player information"""
+
+    def __init__(self):
+        self.max_health = 10 + G.PERMANENT_POWER_UPS["higher_max_health"]
+        self.health = self.max_health
+        self.max_ammo = 10 + G.PERMANENT_POWER_UPS["higher_max_ammo"]
+        self.ammo = self.max_ammo
+        self.score = 0
+        self.reload_duration = 2.5
+        self.reload_start_time = 0
+        self.piercing_rounds = False
+        self.piercing_rounds_start_time = 0
+        self.piercing_rounds_duration = 10
+        self.fan_of_projectiles = False
+        self.fan_of_projectiles_start_time = 0
+        self.fan_of_projectiles_duration = 10
+
+    def update_health(self, health_change):
+        """Adds health_change to health attribute"""
+        self.health += health_change
+
+    def update_ammo(self, ammo_change):
+        """Update ammo"""
+        self.ammo += ammo_change
+
+    def reload(self):
+        """Fills up the players ammo again"""
+        self.ammo = self.max_ammo
+
+    def time_to_reload(self, game_time):
+        """Check if it's time to reload"""
+
+        return (
+            self.ammo == 0
+            and game_time - self.reload_start_time > self.reload_duration
+        )
+
+    def time_to_piercing_rounds_expire(self, game_time):
+        """Check if it's time to let piercing rounds expire"""
+
+        return (
+            game_time - self.piercing_rounds_start_time
+            > self.piercing_rounds_duration
+        )
+
+    def time_to_fan_expire(self, game_time):
+        """Check if it's time to let fan of projectiles expire"""
+
+        return (
+            game_time - self.fan_of_projectiles_start_time
+            > self.fan_of_projectiles_duration
+        )
+
+
+class GameSession(object):
+    """One round of the game, advanced one fixed tick at a time
+
+    step() runs the simulation, observe() reports its state and draw()
+    renders it. With render=False nothing is ever drawn, and with
+    audio=False no sound is played, so a session can run as fast as the
+    CPU allows under SDL's dummy drivers. Every random decision comes from
+    the session's own RNG, so a seed plus the inputs fully determine a
+    round.
+
+    With entity_store=True missiles, projectiles and power ups live in an
+    entity_store.EntityStore instead of sprite groups, for populations
+    too large to update one sprite at a time. It needs numpy.
+    """
+
+    def __init__(
+        self,
+        render=True,
+        audio=True,
+        seed=None,
+        profiler=None,
+        entity_store=False,
+    ):
+        self.render = render
+        self.audio = audio
+        self.profiler = profiler if profiler else prof.FrameProfiler()
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Decode every animation before the first tick, not on first spawn
+        asset_cache.preload()
+        pools.warm_up()
+
+        self.all_sprites_list = pygame.sprite.RenderUpdates()
+        self.missile_list = pygame.sprite.Group()
+        self.projectile_list = pygame.sprite.Group()
+        self.power_up_list = pygame.sprite.Group()
+        self.missile_grid = SpatialHash()
+        self.power_up_grid = SpatialHash()
+        self.animator = Animator()
+        self.store = EntityStore() if entity_store else None
+
+        # The wave and the timeline draw from their own generators, so
+        # the same seed gives the same round whatever the player does
+        wave = waves.new_wave(
+            random.Random(self.rng.getrandbits(64)), G.DIFFICULTY
+        )
+
+        power_ups_to_spawn = self.rng.choices(
+            sprites.Power_Up.power_up_list,
+            weights=[1, 1, 1, 1],
+            k=self.rng.randrange(2, 7),
+        )
+
+        self.spawner = SpawnScheduler(
+            random.Random(self.rng.getrandbits(64)),
+            G.DIFFICULTY,
+            wave,
+            power_ups_to_spawn,
+        )
+
+        self.player = Player()
+        self.gun = sprites.Gun(
+            (G.DISPLAY_WIDTH * 0.5, G.DISPLAY_HEIGHT * 0.875)
+        )
+        self.all_sprites_list.add(self.gun)
+
+        self.dt = 1 / G.TICK_RATE
+        self.tick = 0
+        self.game_time = 0
+        self.game_over = False
+
+        if render:
+            self.renderer = DirtyRenderer(compose_background(G.BACKGROUND_1))
+            self.hud = Hud(
+                self.player.health,
+                self.player.score,
+                self.player.ammo,
+                self.renderer,
+            )
+
+    @property
+    def round_over(self):
+        """True once every missile of the wave has been spawned and gone"""
+        return not self.spawner.missiles_left() and not self.missiles_in_play()
+
+    def missiles_in_play(self):
+        """Number of missiles on screen"""
+        if self.store is not None:
+            return self.store.count_of(entity_store.MISSILE)
+        return len(self.missile_list)
+
+    def play_sound(self, sound, category):
+        """Play a sound effect unless audio is off"""
+        if self.audio:
+            audio.play(sound, category)
+
+    def step(self, inputs=()):
+        """Advance the round by one tick, applying inputs first"""
+
+        mark = self.profiler.mark
+        self.tick += 1
+        self.game_time += self.dt
+        self.handle_inputs(inputs)
+        mark(prof.EVENTS)
+        self.update_timers()
+        mark(prof.TIMERS)
+        self.spawn()
+        mark(prof.SPAWN)
+        self.update_sprites()
+        mark(prof.UPDATE)
+        self.collide()
+        mark(prof.COLLISION)
+
+    def handle_inputs(self, inputs):
+        """Apply player inputs"""
+        for action in inputs:
+            if action == FIRE:
+                self.fire()
+
+    def fire(self):
+        """Fire the gun if there is ammo left"""
+
+        player = self.player
+        if player.ammo <= 0:
+            return
+        player.update_ammo(-1)
+        if player.ammo == 0:
+            player.reload_start_time = self.game_time
+        self.play_sound(G.SHOOT_FX, audio.SHOT)
+        angles = [self.gun.angle]
+        if player.fan_of_projectiles:
+            angles += [self.gun.angle + 15, self.gun.angle - 15]
+        for angle in angles:
+            if self.store is not None:
+                self.store.spawn_projectile(
+                    self.gun.rect.center,
+                    angle,
+                    self.gun.image.get_height() * 0.5,
+                )
+                continue
+            projectile = pools.PROJECTILES.acquire(
+                self.gun.rect.center,
+                angle,
+                self.gun.image.get_height() * 0.5,
+            )
+            self.all_sprites_list.add(projectile)
+            self.projectile_list.add(projectile)
+
+    def update_timers(self):
+        """Reload and let temporary power ups expire"""
+
+        player = self.player
+        if player.time_to_reload(self.game_time):
+            player.reload()
+
+        if player.time_to_piercing_rounds_expire(self.game_time):
+            player.piercing_rounds = False
+
+        if player.time_to_fan_expire(self.game_time):
+            player.fan_of_projectiles = False
+
+    def spawn(self):
+        """Spawn the missiles and power ups that are due"""
+
+        rng = self.rng
+        for kind, payload in self.spawner.due(self.game_time):
+            if kind == MISSILE:
+                pos = (
+                    rng.randrange(
+                        0.1 * G.DISPLAY_WIDTH, 0.9 * G.DISPLAY_WIDTH
+                    ),
+                    -600,
+                )
+                if self.store is not None:
+                    self.store.spawn_missile(pos, payload)
+                    continue
+                new_missile = pools.MISSILES.acquire(pos, payload)
+                self.all_sprites_list.add(new_missile)
+                self.missile_list.add(new_missile)
+                self.missile_grid.insert(new_missile)
+                self.animator.add(new_missile)
+
+            elif kind == POWER_UP:
+                pos = (
+                    rng.randrange(
+                        G.DISPLAY_WIDTH * 0.125, G.DISPLAY_WIDTH * 0.875
+                    ),
+                    rng.randrange(
+                        G.DISPLAY_WIDTH * 0.125, G.DISPLAY_HEIGHT * 0.625
+                    ),
+                )
+                if self.store is not None:
+                    self.store.spawn_power_up(pos, payload)
+                    continue
+                new_power_up_sprite = sprites.Power_Up(pos, payload)
+                self.all_sprites_list.add(new_power_up_sprite)
+                self.power_up_list.add(new_power_up_sprite)
+                self.power_up_grid.insert(new_power_up_sprite)
+                self.animator.add(new_power_up_sprite)
+
+    def update_sprites(self):
+        """Move and animate every sprite"""
+        self.all_sprites_list.update()
+        self.animator.advance(self.dt)
+        self.missile_grid.update(self.missile_list)
+        if self.store is not None:
+            self.store.move(self.dt)
+
+    def handle_missile_event(self, event):
+        """Apply a missile hit or landing and spawn its explosion
+
+        Events are (MISSILE_HIT or MISSILE_LANDED, missile_type, center),
+        the same tuples entity_store.EntityStore.collide returns.
+        """
+
+        kind, missile_type, center = event
+        explosion = pools.EXPLOSIONS.acquire(center, missile_type)
+        self.all_sprites_list.add(explosion)
+        self.animator.add(explosion)
+        self.play_sound(G.EXPLOSION_FX, audio.EXPLOSION)
+        stats = sprites.Missile.missile_stats[missile_type - 1]
+        if kind == MISSILE_HIT:
+            G.SCORE += stats["points"]
+        elif kind == MISSILE_LANDED:
+            self.player.update_health(stats["damage"])
+
+    def collect_power_up(self, power_up):
+        """Apply the effect of a power up that was shot"""
+
+        player = self.player
+        self.play_sound(
+            self.rng.choice(G.POWER_UP_FX_LIST), audio.POWER_UP
+        )
+        power_up_type = power_up["type"]
+        if not power_up["temporary"]:
+            G.PERMANENT_POWER_UPS[power_up_type] += 1
+        if power_up_type == "higher_max_health":
+            player.update_health(1)
+        elif power_up_type == "higher_max_ammo":
+            if player.ammo >= 1:
+                player.update_ammo(1)
+            player.max_ammo += 1
+        elif power_up_type == "piercing_rounds":
+            player.piercing_rounds = True
+            player.piercing_rounds_start_time = self.game_time
+        elif power_up_type == "fan_of_projectiles":
+            player.fan_of_projectiles = True
+            player.fan_of_projectiles_start_time = self.game_time
+
+    def collide(self):
+        """Resolve hits and remove everything that left the screen"""
+
+        if self.store is not None:
+            self.collide_store()
+            return
+
+        for projectile in self.projectile_list:
+            for hit_missile in self.missile_grid.collide(projectile, True):
+                self.handle_missile_event(
+                    (
+                        MISSILE_HIT,
+                        hit_missile.missile_type,
+                        hit_missile.rect.center,
+                    )
+                )
+                if not self.player.piercing_rounds:
+                    projectile.kill()
+
+            for hit_power_up in self.power_up_grid.collide(projectile, True):
+                self.collect_power_up(hit_power_up.power_up)
+
+            if projectile.off_screen():
+                projectile.kill()
+
+        for missile in self.missile_list:
+            if missile.off_screen():
+                missile.kill()
+                self.missile_grid.remove(missile)
+                self.handle_missile_event(
+                    (
+                        MISSILE_LANDED,
+                        missile.missile_type,
+                        missile.rect.center,
+                    )
+                )
+                if self.player.health <= 0:
+                    self.game_over = True
+
+    def collide_store(self):
+        """Apply the events of the entity store's collision pass"""
+
+        self.store.piercing_rounds = self.player.piercing_rounds
+        for event in self.store.collide():
+            kind, subtype, _ = event
+            if kind == POWER_UP_HIT:
+                self.collect_power_up(sprites.Power_Up.power_up_list[subtype])
+                continue
+            self.handle_missile_event(event)
+            if kind == MISSILE_LANDED and self.player.health <= 0:
+                self.game_over = True
+
+    def release(self):
+        """Kill everything still in play, returning pooled sprites"""
+
+        for sprite in self.all_sprites_list.sprites():
+            sprite.kill()
+        if self.store is not None:
+            self.store.clear()
+
+    def observe(self):
+        """Return a plain snapshot of the round state"""
+
+        player = self.player
+        observation = {
+            "tick": self.tick,
+            "game_time": self.game_time,
+            "difficulty": G.DIFFICULTY,
+            "score": G.SCORE,
+            "health": player.health,
+            "ammo": player.ammo,
+            "max_ammo": player.max_ammo,
+            "piercing_rounds": player.piercing_rounds,
+            "fan_of_projectiles": player.fan_of_projectiles,
+            "gun_angle": self.gun.angle,
+            "missiles": [
+                (missile.missile_type, missile.rect.centerx, missile.y)
+                for missile in self.missile_list
+            ],
+            "projectiles": [
+                (projectile.x, projectile.y)
+                for projectile in self.projectile_list
+            ],
+            "power_ups": [
+                (power_up.power_up["type"],) + power_up.rect.center
+                for power_up in self.power_up_list
+            ],
+            "missiles_to_spawn": self.spawner.missiles_left(),
+            "round_over": self.round_over,
+            "game_over": self.game_over,
+        }
+        if self.store is not None:
+            observation.update(self.store.observe())
+        return observation
+
+    def interpolate(self, alpha):
+        """Draw moving sprites between the last two ticks"""
+
+        for sprite in self.missile_list:
+            sprite.interpolate(alpha)
+        for sprite in self.projectile_list:
+            sprite.interpolate(alpha)
+        if self.store is not None:
+            self.store.interpolate(alpha)
+
+    def invalidate(self):
+        """Repaint the whole screen next frame"""
+        if self.render:
+            self.renderer.invalidate()
+
+    def draw(self):
+        """Render the round onto the screen surface"""
+
+        if not self.render:
+            return
+
+        mark = self.profiler.mark
+
+        # Repaint the background under last frame's sprites
+        full_redraw = self.renderer.begin_frame()
+        erased = self.renderer.clear(self.all_sprites_list)
+        if self.store is not None:
+            erased += self.store.erase(self.renderer)
+        mark(prof.DRAW)
+        self.hud.draw_hud(
+            G.SCORE,
+            self.player.ammo,
+            self.player.health,
+            erased,
+            full_redraw,
+        )
+        mark(prof.HUD)
+
+        # Draw all sprites
+        if self.store is not None:
+            self.store.draw(self.renderer)
+        self.renderer.draw(self.all_sprites_list)
+
+        if G.DEBUG_COLLISION:
+            self.missile_grid.draw_debug(G.SCREEN)
+            self.power_up_grid.draw_debug(G.SCREEN, G.GOLD)
+            # The overlay is not tracked, so repaint everything next frame
+            self.renderer.invalidate()
+
+        if G.SHOW_PROFILER:
+            sound = audio.stats()
+            self.renderer.blit(
+                self.profiler.render_overlay(
+                    self.entity_counts(),
+                    [
+                        f"voices {sound['voices']}/{sound['peak_voices']}  "
+                        f"merged {sound['coalesced']}  "
+                        f"stolen {sound['stolen']}  "
+                        f"dropped {sound['dropped']}"
+                    ],
+                ),
+                prof.OVERLAY_RECT,
+            )
+        mark(prof.DRAW)
+
+    def flip(self):
+        """Push only the changed rects to the display"""
+        if self.render:
+            self.renderer.flush()
+        self.profiler.mark(prof.FLIP)
+
+    def entity_counts(self):
+        """Number of sprites in each group"""
+
+        missiles = len(self.missile_list)
+        projectiles = len(self.projectile_list)
+        power_ups = len(self.power_up_list)
+        # Everything else but the gun is an explosion
+        explosions = (
+            len(self.all_sprites_list) - missiles - projectiles - power_ups - 1
+        )
+        if self.store is not None:
+            missiles = self.store.count_of(entity_store.MISSILE)
+            projectiles = self.store.count_of(entity_store.PROJECTILE)
+            power_ups = self.store.count_of(entity_store.POWER_UP)
+        return {
+            "missiles": missiles,
+            "shots": projectiles,
+            "power ups": power_ups,
+            "explosions": explosions,
+        }
@@ -17,7 +17,7 @@ setup(
     author="Caleb Werth & Russell Spry",
     options={
         "build_exe": {
-            "packages": ["pygame"],
+            "packages": ["pygame", "numpy"],
             "include_files": [
                 "README.md",
                 "LICENSE",
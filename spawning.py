@@ -0,0 +1,83 @@
+"""When missiles and power ups appear during a round"""
+import heapq
+from itertools import count
+from waves import Wave
+
+# Event kinds
+MISSILE = "missile"
+POWER_UP = "power_up"
+
+# Mean seconds between spawns. These match the per-tick rolls they
+# replace, one in 700 // (5 + difficulty) and one in 500 at 60 ticks a
+# second.
+POWER_UP_GAP = 500 / 60
+
+
+def missile_gap(difficulty):
+    """Mean seconds between missiles at difficulty
+
+    From round 696 the original roll would be one in zero, so the gap
+    bottoms out at one tick's worth.
+    """
+    return max(700 // (5 + difficulty), 1) / 60
+
+
+class SpawnScheduler(object):
+    """A min-heap of timed spawn events for one round
+
+    Gaps between spawns are drawn from rng, so a seed and difficulty fix
+    the whole timeline, and they are in game seconds, so the frame and
+    tick rates don't change how dense it is. Power ups are all scheduled
+    up front. Missiles are scheduled one ahead: popping one schedules
+    the next from the wave, so the heap stays small however big the wave
+    is.
+    """
+
+    def __init__(self, rng, difficulty, wave, power_ups):
+        self.rng = rng
+        self.wave = wave
+        self.missile_gap = missile_gap(difficulty)
+        self.events = []
+        # Breaks ties between events due at the same time, in push order
+        self.order = count()
+        self.pending_missiles = 0
+
+        time = 0
+        for power_up in power_ups:
+            time += rng.expovariate(1 / POWER_UP_GAP)
+            self.push(time, POWER_UP, power_up)
+        self.schedule_missile(0)
+
+    def push(self, time, kind, payload):
+        """Add an event due at time"""
+        heapq.heappush(self.events, (time, next(self.order), kind, payload))
+
+    def schedule_missile(self, after):
+        """Schedule the wave's next missile, if any, some time after after"""
+
+        if self.wave:
+            time = after + self.rng.expovariate(1 / self.missile_gap)
+            self.push(time, MISSILE, next(self.wave))
+            self.pending_missiles += 1
+
+    def due(self, now):
+        """Yield (kind, payload) for every event due by now, in order"""
+
+        events = self.events
+        while events and events[0][0] <= now:
+            time, _, kind, payload = heapq.heappop(events)
+            if kind == MISSILE:
+                self.pending_missiles -= 1
+                self.schedule_missile(time)
+            yield kind, payload
+
+    def missiles_left(self):
+        """Missiles that haven't spawned yet"""
+        return self.wave.remaining + self.pending_missiles
+
+    def clear(self):
+        """Drop every event still to come"""
+
+        self.events = []
+        self.pending_missiles = 0
+        self.wave = Wave(self.rng, 0)
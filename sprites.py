@@ -3,9 +3,33 @@
 import pygame
 from math import cos, sin, radians
 import global_variables as G
+import asset_cache
 
 
-class Missile(pygame.sprite.Sprite):
+class PooledSprite(pygame.sprite.Sprite):
+    """A sprite that returns to its pools.SpritePool when killed
+
+    Subclasses set themselves up in reset(), which takes the same
+    arguments as the constructor, so a pool can reuse a killed sprite.
+    """
+
+    def __init__(self, *args):
+        super(PooledSprite, self).__init__()
+        self.pool = None
+        self.reset(*args)
+
+    def reset(self, *args):
+        """Set the sprite up as if it were new"""
+        raise NotImplementedError
+
+    def kill(self):
+        super(PooledSprite, self).kill()
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.release(self)
+
+
+class Missile(PooledSprite):
     """These missiles rain from the sky to attack the player"""
 
     missile_stats = [
@@ -14,65 +38,44 @@ class Missile(pygame.sprite.Sprite):
         {"speed": 6, "damage": -1, "points": 1},
     ]
 
-    def __init__(self, pos, missile_type):
-        super(Missile, self).__init__()
-        self.images = []
+    # Seconds each frame is shown for, see animation.Animator
+    frame_time = 0.03
+    loop = True
+
+    def reset(self, pos, missile_type):
         self.missile_type = missile_type
-        for i in range(10):
-            self.images.append(
-                pygame.image.load(
-                    f"assets/missiles/missile-{missile_type}_fly-{i}.png"
-                ).convert_alpha()
-            )
-        self.index = 0
-        self.image = self.images[self.index]
+        self.frames = asset_cache.missile_frames(missile_type)
+        self.image = self.frames[0]
         self.rect = self.image.get_rect(center=pos)
-        self.last_update = pygame.time.get_ticks()
-        self.frame_rate = 30
         self.stats = self.missile_stats[missile_type - 1]
+        self.speed = self.stats["speed"] * G.TICK_SCALE
+        self.y = self.prev_y = self.rect.y
 
     def update(self):
-        self.rect.y += self.stats["speed"]
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.index += 1
-            if self.index == len(self.images):
-                self.index = 0
-            self.image = self.images[self.index]
+        self.prev_y = self.y
+        self.y += self.speed
+        self.rect.y = round(self.y)
+
+    def interpolate(self, alpha):
+        """Place the rect between the last two ticks for drawing"""
+        self.rect.y = round(self.prev_y + (self.y - self.prev_y) * alpha)
 
     def off_screen(self):
         """Check if missile is off screen"""
         return self.rect.y > G.DISPLAY_HEIGHT - (self.image.get_height() * 0.8)
 
 
-class Missile_Explosion(pygame.sprite.Sprite):
+class Missile_Explosion(PooledSprite):
     """A missile explosion"""
 
-    def __init__(self, pos, missile_type):
-        super(Missile_Explosion, self).__init__()
-        self.images = []
-        for i in range(9):
-            self.images.append(
-                pygame.image.load(
-                    f"assets/missiles/missile-{missile_type}_exp-{i}.png"
-                ).convert_alpha()
-            )
-        self.index = 0
-        self.image = self.images[self.index]
-        self.rect = self.image.get_rect(center=pos)
-        self.last_update = pygame.time.get_ticks()
-        self.frame_rate = 45
+    # Plays once, then the animator kills it
+    frame_time = 0.045
+    loop = False
 
-    def update(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.index += 1
-            if self.index == len(self.images):
-                self.kill()
-            else:
-                self.image = self.images[self.index]
+    def reset(self, pos, missile_type):
+        self.frames = asset_cache.explosion_frames(missile_type)
+        self.image = self.frames[0]
+        self.rect = self.image.get_rect(center=pos)
 
 
 class Button(pygame.sprite.Sprite):
@@ -97,12 +100,11 @@ class Button(pygame.sprite.Sprite):
         self.function()
 
 
-class Projectile(pygame.sprite.Sprite):
+class Projectile(PooledSprite):
     """This is what the rotating gun fires"""
 
-    def __init__(self, pos, angle, initial_offset=0):
-        super(Projectile, self).__init__()
-        self.image = pygame.image.load("assets/projectile.png").convert_alpha()
+    def reset(self, pos, angle, initial_offset=0):
+        self.image = asset_cache.projectile_image()
         self.rect = self.image.get_rect(
             center=(
                 pos[0] - round(initial_offset * sin(radians(angle))),
@@ -110,13 +112,24 @@ class Projectile(pygame.sprite.Sprite):
             )
         )
         self.speed = 5
-        self.x_vel = -round(self.speed * sin(radians(angle)))
-        self.y_vel = -round(self.speed * cos(radians(angle)))
+        self.x_vel = -round(self.speed * sin(radians(angle))) * G.TICK_SCALE
+        self.y_vel = -round(self.speed * cos(radians(angle))) * G.TICK_SCALE
+        self.x = self.prev_x = self.rect.x
+        self.y = self.prev_y = self.rect.y
 
     def update(self):
         """Update position of projectile"""
-        self.rect.x += self.x_vel
-        self.rect.y += self.y_vel
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.x_vel
+        self.y += self.y_vel
+        self.rect.x = round(self.x)
+        self.rect.y = round(self.y)
+
+    def interpolate(self, alpha):
+        """Place the rect between the last two ticks for drawing"""
+        self.rect.x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        self.rect.y = round(self.prev_y + (self.y - self.prev_y) * alpha)
 
     def off_screen(self):
         """Check to see if projectile is off screen"""
@@ -135,13 +148,12 @@ class Gun(pygame.sprite.Sprite):
     def __init__(self, pos):
         super(Gun, self).__init__()
 
-        self.original_image = pygame.image.load(
-            "assets/gun.png"
-        ).convert_alpha()
-        self.image = self.original_image
-        self.rect = self.image.get_rect(center=pos)
+        self.rotations = asset_cache.gun_rotations()
+        self.center = pos
         self.turning_left = True
         self.angle = 0
+        self.turn_speed = 2 * G.TICK_SCALE
+        self.image, self.rect = self.rotations.get(self.angle, self.center)
 
     def update(self):
         """Rotate the gun"""
@@ -152,12 +164,14 @@ class Gun(pygame.sprite.Sprite):
             self.turning_left = True
 
         if self.turning_left:
-            self.angle += 2
+            self.angle += self.turn_speed
         else:
-            self.angle -= 2
+            self.angle -= self.turn_speed
 
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        # The rotation table holds every even angle
+        self.image, self.rect = self.rotations.get(
+            2 * round(self.angle / 2), self.center
+        )
 
 
 class Power_Up(pygame.sprite.Sprite):
@@ -170,30 +184,15 @@ class Power_Up(pygame.sprite.Sprite):
         {"type": "fan_of_projectiles", "color": "Green", "temporary": True},
     ]
 
+    frame_time = 0.03
+    loop = True
+
     def __init__(self, pos, power_up_type):
         super(Power_Up, self).__init__()
 
         self.power_up = power_up_type
 
-        self.images = []
-        for i in range(1, 7):
-            self.images.append(
-                pygame.image.load(
-                    f"assets/power-ups/{self.power_up['color']}/frame_{i}.png"
-                ).convert_alpha()
-            )
+        self.frames = asset_cache.power_up_frames(self.power_up["color"])
 
-        self.index = 0
-        self.image = self.images[self.index]
+        self.image = self.frames[0]
         self.rect = self.image.get_rect(center=pos)
-        self.last_update = pygame.time.get_ticks()
-        self.frame_rate = 30
-
-    def update(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.index += 1
-            if self.index == len(self.images):
-                self.index = 0
-            self.image = self.images[self.index]
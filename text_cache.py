@@ -0,0 +1,56 @@
+"""Cached text rendering"""
+from functools import lru_cache
+import pygame
+
+
+@lru_cache(maxsize=256)
+def render_text(text, font, color, antialias=True):
+    """font.render, memoized on text, font, color and antialias
+
+    The returned surface is shared, so callers must not draw on it.
+    """
+    return font.render(text, antialias, color)
+
+
+def stats():
+    """Hit and miss counts of the text cache"""
+
+    info = render_text.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "entries": info.currsize,
+    }
+
+
+def join(*surfaces):
+    """Lay surfaces out left to right on one transparent surface"""
+
+    width = sum(surface.get_width() for surface in surfaces)
+    height = max(surface.get_height() for surface in surfaces)
+    joined = pygame.Surface((width, height), pygame.SRCALPHA)
+    x = 0
+    for surface in surfaces:
+        joined.blit(surface, (x, height - surface.get_height()))
+        x += surface.get_width()
+    return joined
+
+
+class DigitAtlas(object):
+    """Pre-rendered digit glyphs of one font and color
+
+    Numbers are composed from the glyphs instead of being rasterized by
+    the font each time they change.
+    """
+
+    def __init__(self, font, color, characters="0123456789-"):
+        self.glyphs = {
+            character: render_text(character, font, color)
+            for character in characters
+        }
+
+    def render(self, number):
+        """Return a surface showing number"""
+        return join(*(self.glyphs[character] for character in str(number)))
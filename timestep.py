@@ -0,0 +1,37 @@
+"""Fixed timestep simulation clock"""
+
+
+class FixedTimestep(object):
+    """Hands out real frame time as whole simulation ticks
+
+    Leftover time is carried over to the next frame, and alpha says how far
+    the renderer is between the last two ticks so it can interpolate.
+    """
+
+    def __init__(self, tick_rate, max_ticks_per_frame=8):
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add frame_time seconds and return how many ticks to simulate"""
+
+        self.accumulator += frame_time
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks_per_frame:
+            # Too far behind to catch up, so drop the backlog
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """Fraction of a tick between the last tick and now"""
+        return self.accumulator / self.dt
+
+    def reset(self):
+        """Forget any accumulated time, e.g. after a pause"""
+        self.accumulator = 0.0
@@ -0,0 +1,66 @@
+"""Missile waves
+
+A difficulty curve maps the round number to how many missiles the wave
+has, and a Wave draws their types one at a time as they spawn, so a
+wave of any size costs the same small, constant amount of memory.
+"""
+from functions import fib
+
+MISSILE_TYPES = (1, 2, 3)
+# Weights 1, 2 and 3, cumulative so drawing a type skips the summing
+MISSILE_CUM_WEIGHTS = (1, 3, 6)
+
+
+def fibonacci(difficulty):
+    """The original curve: every round is the sum of the previous two"""
+    return fib(difficulty + 5)
+
+
+def linear(difficulty, base=8, step=5):
+    """base missiles, plus step more every round"""
+    return base + step * (difficulty - 1)
+
+
+def capped(curve, maximum):
+    """Return curve limited to maximum missiles a round"""
+
+    def capped_curve(difficulty):
+        return min(curve(difficulty), maximum)
+
+    return capped_curve
+
+
+# The curve new waves follow
+CURVE = fibonacci
+
+
+class Wave(object):
+    """The missile types of one round, drawn lazily from rng
+
+    remaining is the number of missiles still to come and next() draws
+    the next type. There is no len(): late rounds hold more missiles than
+    it can return, so count with remaining or use truth testing.
+    """
+
+    def __init__(self, rng, size):
+        self.rng = rng
+        self.remaining = size
+
+    def __bool__(self):
+        return self.remaining > 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.remaining:
+            raise StopIteration
+        self.remaining -= 1
+        return self.rng.choices(
+            MISSILE_TYPES, cum_weights=MISSILE_CUM_WEIGHTS
+        )[0]
+
+
+def new_wave(rng, difficulty, curve=None):
+    """Return the wave for a round of difficulty, following curve"""
+    return Wave(rng, (curve or CURVE)(difficulty))